@@ -0,0 +1,133 @@
+import re
+
+
+# Weak phrase -> strong action verb. None protects a phrase from shorter
+# matches inside it ("used to" is not "utilized to").
+ACTION_VERB_REPLACEMENTS = {
+    "did": "executed",
+    "did work": "performed",
+    "did not": None,
+    "made": "created",
+    "made sure": "ensured",
+    "helped": "assisted",
+    "worked on": "developed",
+    "was responsible for": "managed",
+    "were responsible for": "managed",
+    "responsible for": "managed",
+    "handled": "coordinated",
+    "dealt with": "resolved",
+    "used": "utilized",
+    "used to": None,
+    "got": "achieved",
+    "got to": None,
+    "took part in": "participated in",
+    "was in charge of": "led",
+    "in charge of": "led",
+    "tried to": "sought to",
+}
+
+
+def _trie_pattern(phrases):
+    """Regex alternation shaped as a trie, so matching never rescans shared prefixes.
+
+    Spaces inside phrases match any run of whitespace.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        if list(node) == [""]:
+            return ""
+        branches = []
+        optional = False
+        for char, child in sorted(node.items()):
+            if char == "":
+                optional = True
+                continue
+            token = r"\s+" if char == " " else re.escape(char)
+            branches.append(token + build(child))
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if optional:
+            # Quantifiers are greedy, so the longer phrase is tried first
+            pattern = f"(?:{pattern})?"
+        return pattern
+
+    return build(trie)
+
+
+def _match_case(source, replacement):
+    if source.isupper() and len(source) > 1:
+        return replacement.upper()
+    if source[:1].isupper():
+        return replacement[:1].upper() + replacement[1:]
+    return replacement
+
+
+class ActionVerbRewriter:
+    """Replaces weak phrases with action verbs in one pass over the text.
+
+    Phrases match whole words only (case-insensitively, keeping the
+    source's capitalization), the longest phrase wins, and the phrase table
+    can be extended with add(). The phrase table is compiled into a single
+    trie-shaped regex, so the cost is linear in the text length.
+    """
+
+    def __init__(self, replacements=None):
+        self.replacements = {}
+        self._pattern = None
+        self.update(ACTION_VERB_REPLACEMENTS if replacements is None else replacements)
+
+    def add(self, phrase, replacement):
+        """Add or change one phrase; replacement None protects the phrase from being rewritten."""
+        self.update({phrase: replacement})
+
+    def update(self, replacements):
+        for phrase, replacement in replacements.items():
+            self.replacements[" ".join(phrase.lower().split())] = replacement
+        self._pattern = re.compile(
+            r"(?<![\w'’-])" + _trie_pattern(self.replacements) + r"(?![\w'’-])", re.IGNORECASE
+        ) if self.replacements else None
+
+    def _replace(self, match):
+        source = match.group(0)
+        replacement = self.replacements.get(" ".join(source.lower().split()))
+        return source if replacement is None else _match_case(source, replacement)
+
+    def subn(self, text):
+        """Rewrite a text, returning it with the number of phrases replaced."""
+        if self._pattern is None:
+            return text, 0
+        replaced = 0
+
+        def replace(match):
+            nonlocal replaced
+            result = self._replace(match)
+            replaced += result != match.group(0)
+            return result
+
+        return self._pattern.sub(replace, text), replaced
+
+    def rewrite(self, text):
+        """Rewrite a text."""
+        return self._pattern.sub(self._replace, text) if self._pattern is not None else text
+
+    def rewrite_many(self, texts):
+        """Rewrite many documents with the same compiled phrase table."""
+        return [self.rewrite(text) for text in texts]
+
+
+_default_rewriter = ActionVerbRewriter()
+
+
+def enhance_action_verbs(text):
+    """Rewrite a text with the default phrase table."""
+    return _default_rewriter.rewrite(text)
+
+
+def enhance_action_verbs_batch(texts):
+    """Rewrite many texts with the default phrase table."""
+    return _default_rewriter.rewrite_many(texts)
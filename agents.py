@@ -1,48 +1,78 @@
 import re 
-import PyPDF2
-import io
-import tempfile
+import importlib.util
 import os 
 import json
-import torch
+import time
+import uuid
 from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from llm import (
+    UsageTracker, BudgetExceeded, merge_usage_summaries, estimate_tokens, LANGCHAIN_CALLBACKS_AVAILABLE,
+    RateLimitError, LLMTimeoutError, parse_retry_after, get_shared_limiter, ResilientCaller,
+    get_shared_router, get_shared_single_flight, usage_callback_handler
+)
+from storage import get_shared_skill_cache, resume_fingerprint, content_hash, normalize_skill
+from resources import get_registry, credential_key
+from extraction import ExtractionError, ExtractionLimits, extract_document, normalize_text
+from resume_parser import parse_resume, resume_for_prompt, resume_to_markdown
+from ats import analyze_ats, get_industry_index
+from dedup import REUSE_THRESHOLD, get_near_duplicate_index
+from prescore import SkillPrescorer
+from action_verbs import enhance_action_verbs, enhance_action_verbs_batch
 
 
-
-# Try to import optional dependencies
-try:
-    from langchain_groq import ChatGroq
-    GROQ_AVAILABLE = True
-except ImportError:
-    GROQ_AVAILABLE = False
+# Optional dependencies are heavy, so only check they are installed here and
+# import them on the code paths that use them
+GROQ_AVAILABLE = importlib.util.find_spec("langchain_groq") is not None
+if not GROQ_AVAILABLE:
     print("Warning: langchain-groq not installed. Please install it with: pip install langchain-groq")
 
-try:
-    from langchain_openai import OpenAIEmbeddings
-    from langchain_community.vectorstores import FAISS
-    from langchain.chains import RetrievalQA
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-    LANGCHAIN_AVAILABLE = True
-except ImportError:
-    LANGCHAIN_AVAILABLE = False
+LANGCHAIN_AVAILABLE = all(
+    importlib.util.find_spec(package) is not None
+    for package in ("langchain", "langchain_community", "langchain_openai")
+)
+if not LANGCHAIN_AVAILABLE:
     print("Warning: Some langchain packages not installed. Vector embeddings will be disabled.")
 
-# Fallback imports
-try:
-    import requests
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    REQUESTS_AVAILABLE = False
+# Fallback client dependency, also imported on first use
+REQUESTS_AVAILABLE = importlib.util.find_spec("requests") is not None
+
+HTTP_POOL_SIZE = 32
+# Prompt tokens a retrieval chain adds to its query: the retrieved chunks "stuffed" into the prompt
+CHAIN_CONTEXT_TOKENS = 1000
+
+
+def shared_http_session(base_url):
+    """Return the process-wide keep-alive session for an API host.
+
+    Credentials are sent per request, so every account and agent talking to
+    the same host shares one connection pool.
+    """
+    def create():
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    return get_registry().get("http_session", base_url, create)
+
 
 class SimpleGroqClient:
     """Simple Groq API client for direct HTTP requests."""
-    def __init__(self, api_key):
+    def __init__(self, api_key, model="llama-3.1-70b-versatile", timeout=30, session=None):
         self.api_key = api_key
-        self.base_url = "https://api.groq.com/openai/v1/chat/completions"
+        self.model = model
+        self.timeout = timeout
+        self.session = session
+        # GROQ_BASE_URL is also honored by the groq SDK, so both clients can target a stand-in server
+        self.base_url = os.getenv("GROQ_BASE_URL", "https://api.groq.com").rstrip("/") + "/openai/v1/chat/completions"
     
     def invoke(self, prompt):
         if not REQUESTS_AVAILABLE:
             raise Exception("requests library not available")
+        import requests
         
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -50,14 +80,19 @@ class SimpleGroqClient:
         }
         
         data = {
-            "model": "llama-3.1-70b-versatile",
+            "model": self.model,
             "messages": [{"role": "user", "content": prompt}],
             "temperature": 0
         }
         
         try:
             print(f"Making API call to Groq...")
-            response = requests.post(self.base_url, headers=headers, json=data, timeout=30)
+            response = (self.session or requests).post(self.base_url, headers=headers, json=data, timeout=self.timeout)
+            
+            if response.status_code == 429:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                print(f"API rate limited, retry after: {retry_after}")
+                raise RateLimitError(f"API returned status 429: {response.text}", retry_after=retry_after)
             
             if response.status_code != 200:
                 print(f"API Error: Status {response.status_code}")
@@ -70,103 +105,365 @@ class SimpleGroqClient:
                 raise Exception(f"Invalid API response format: {result}")
             
             class MockResponse:
-                def __init__(self, content):
+                def __init__(self, content, usage):
                     self.content = content
+                    self.usage = usage
             
             content = result['choices'][0]['message']['content']
             print(f"API call successful, response length: {len(content)}")
-            return MockResponse(content)
+            return MockResponse(content, result.get('usage', {}))
             
         except requests.exceptions.Timeout:
-            raise Exception("API request timed out")
+            raise LLMTimeoutError("API request timed out")
+        except (RateLimitError, LLMTimeoutError):
+            raise
         except requests.exceptions.RequestException as e:
             raise Exception(f"Network error: {e}")
         except Exception as e:
             raise Exception(f"Groq API error: {e}")
 
+class UploadedDocument:
+    """In-memory document with the same interface as a Streamlit upload."""
+
+    def __init__(self, name, data):
+        self.name = name
+        self.data = data
+
+    def getvalue(self):
+        return self.data
+
+@dataclass(frozen=True)
+class AnalysisContext:
+    """Everything one analysis knows about its candidate.
+
+    The agent keeps no per-candidate state: its methods take a context and
+    return a new one (dataclasses.replace), so one agent and its client pool
+    can serve many analyses concurrently.
+    """
+    resume_text: str
+    skills: list = field(default_factory=list)
+    jd_text: str = None
+    result: dict = None
+    weaknesses: list = field(default_factory=list)
+    vectorstore: object = None
+    usage_tracker: UsageTracker = field(default_factory=UsageTracker)
+    checkpoint: object = None
+    skill_memo: object = None
+    # parse_resume() output, computed once per analysis and rendered per call type
+    sections: dict = None
+
+    @property
+    def strengths(self):
+        scores = (self.result or {}).get("skills_scores", {})
+        return [skill for skill, score in scores.items() if score > 7]
+
+    @property
+    def improvement_suggestions(self):
+        return {
+            weakness["skill"]: {"suggestions": weakness["suggestions"], "example": weakness["example"]}
+            for weakness in self.weaknesses if "suggestions" in weakness
+        }
+
+
+def apply_cutoff(result, cutoff_score):
+    """Return a copy of an analysis result with selection decided for a cutoff score.
+
+    Selection only depends on the stored overall score and missing skills, so
+    changing the cutoff never needs another LLM call.
+    """
+    if not result:
+        return result
+    selected = result.get("overall_score", 0) >= cutoff_score
+    return dict(
+        result,
+        selected=selected,
+        cutoff_score=cutoff_score,
+        improvement_areas=[] if selected else list(result.get("missing_skills", []))
+    )
+
+
+def score_summary(results, reasoning, cutoff_score):
+    """Build an analysis result from (skill, score, reasoning) tuples.
+
+    The overall score is the average skill score as a percentage; skills
+    scoring 5 or less are reported as missing.
+    """
+    skills_scores = {skill: score for skill, score, _ in results}
+    return apply_cutoff({
+        "overall_score": int((sum(skills_scores.values()) / (len(results) * 10)) * 100) if results else 0,
+        "skills_scores": skills_scores,
+        "skill_reasoning": {skill: skill_reasoning for skill, _, skill_reasoning in results},
+        "reasoning": reasoning,
+        "missing_skills": [skill for skill, score, _ in results if score <= 5]
+    }, cutoff_score)
+
+
+def apply_cutoff_to_batch(batch, cutoff_score):
+    """Re-decide selection for every candidate of an analyze_batch / resume_batch output."""
+    return dict(batch, candidates=[
+        dict(entry, result=apply_cutoff(entry.get("result"), cutoff_score))
+        for entry in batch.get("candidates", [])
+    ])
+
+
 class ResumeAnalysisAgent:
-    def __init__(self, groq_api_key, openai_api_key=None, cutoff_score=75):
+    def __init__(self, groq_api_key, openai_api_key=None, cutoff_score=75, max_tokens=None, max_cost=None,
+                 hedge_requests=False, model_routes=None, test_connection=True, skill_cache=None,
+                 extraction_limits=None, near_duplicate_index=None, evidence_thresholds=None):
         self.groq_api_key = groq_api_key
         self.openai_api_key = openai_api_key or "dummy_key"
         self.cutoff_score = cutoff_score
-        self.resume_text = None
-        self.rag_vectorstore = None
-        self.analysis_result = None
-        self.jd_text = None
-        self.extracted_skills = None
-        self.resume_weaknesses = []
-        self.resume_strengths = []
-        self.improvement_suggestions = {}
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        # Usage of calls made outside an analysis; each analysis has its own tracker and budget
+        self.usage_tracker = UsageTracker()
+        # Most recent analysis from analyze_resume, for single-user callers
+        self.context = None
+        # Per-skill results memoized by resume fingerprint, so editing the skill
+        # list or JD only scores the skills that changed. Pass skill_cache=False to disable.
+        self.skill_cache = get_shared_skill_cache() if skill_cache is None else (skill_cache or None)
+        # MinHash index of analyzed resumes, so resubmissions are flagged and a
+        # near-identical resume reuses the earlier per-skill results. Pass False to disable.
+        if near_duplicate_index is None:
+            near_duplicate_index = get_near_duplicate_index()
+        self.near_duplicates = near_duplicate_index if near_duplicate_index is not False else None
+        # (floor, ceiling) similarities for embedding pre-scoring; None uses the embedding model's calibration
+        self.evidence_thresholds = evidence_thresholds
+        # Time, memory and size limits for turning each upload into text
+        self.extraction_limits = extraction_limits or ExtractionLimits()
         
-        # Initialize LLM client
-        if GROQ_AVAILABLE:
-            self.llm_client = ChatGroq(model="qwen/qwen3-32b", api_key=self.groq_api_key, temperature=0)
-        elif REQUESTS_AVAILABLE:
-            self.llm_client = SimpleGroqClient(self.groq_api_key)
-        else:
+        # Clients, connection pools, embeddings and caches live in the process-wide
+        # registry, shared by every session and agent using the same credentials
+        self.registry = get_registry()
+        self.registry.attach(self)
+        self.account_key = credential_key("groq", groq_api_key)
+        # Concurrency limiter and model health shared by every agent using the same Groq account
+        self.limiter = get_shared_limiter(self.account_key)
+        self.router = get_shared_router(self.account_key, model_routes)
+        # Retries with backoff, plus optional hedged requests against stragglers
+        self.caller = ResilientCaller(self.limiter, hedge=hedge_requests)
+        # Identical prompts in flight at the same time, from any agent on the account, share one call
+        self.single_flight = get_shared_single_flight(self.account_key)
+        
+        # Initialize LLM clients, one per routed model
+        if not GROQ_AVAILABLE and not REQUESTS_AVAILABLE:
             raise Exception("No suitable LLM client available. Please install langchain-groq or requests.")
+        self.model_name = self.router.route("default")
+        self.llm_client = self._client_for(self.model_name)
         
-        # Test the API connection
-        self._test_api_connection()
+        # Test the API connection, once per account and process
+        if test_connection:
+            self.registry.get("api_check", self.account_key, self._test_api_connection)
+    
+    # Read-only views of the most recent analysis, for callers written before AnalysisContext
+    @property
+    def resume_text(self):
+        return self.context.resume_text if self.context else None
+    
+    @property
+    def jd_text(self):
+        return self.context.jd_text if self.context else None
+    
+    @property
+    def extracted_skills(self):
+        return self.context.skills if self.context else None
+    
+    @property
+    def analysis_result(self):
+        return self.context.result if self.context else None
+    
+    @property
+    def resume_strengths(self):
+        return self.context.strengths if self.context else []
+    
+    @property
+    def resume_weaknesses(self):
+        return self.context.weaknesses if self.context else []
+    
+    @property
+    def improvement_suggestions(self):
+        return self.context.improvement_suggestions if self.context else {}
+    
+    @property
+    def rag_vectorstore(self):
+        return self.context.vectorstore if self.context else None
+    
+    def _client_for(self, model):
+        """Return the shared LLM client for a model on this account, creating it on first use."""
+        def create():
+            if GROQ_AVAILABLE:
+                from langchain_groq import ChatGroq
+                return ChatGroq(model=model, api_key=self.groq_api_key, temperature=0)
+            client = SimpleGroqClient(self.groq_api_key, model=model)
+            client.session = shared_http_session(client.base_url)
+            return client
+        return self.registry.get("llm_client", (self.account_key, model), create)
+    
+    def _embeddings(self):
+        """Return the shared embedding backend for this OpenAI key."""
+        from langchain_openai import OpenAIEmbeddings
+        return self.registry.get(
+            "embeddings", credential_key("openai", self.openai_api_key),
+            lambda: OpenAIEmbeddings(api_key=self.openai_api_key)
+        )
+    
+    def _prescorer(self):
+        """Return the shared skill prescorer, which keeps skill embeddings across analyses."""
+        return self.registry.get(
+            "prescorer", (credential_key("openai", self.openai_api_key), self.evidence_thresholds),
+            lambda: SkillPrescorer(self._embeddings(), self.evidence_thresholds)
+        )
+    
+    def _text_splitter(self):
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        return self.registry.get(
+            "text_splitter", (1000, 200),
+            lambda: RecursiveCharacterTextSplitter(separator="\n", chunk_size=1000, chunk_overlap=200, length_function=len,)
+        )
+    
+    def _tracker(self, context):
+        return context.usage_tracker if context else self.usage_tracker
+    
+    def _invoke(self, prompt, call_type, context=None):
+        """Invoke the model routed for the call type and record token usage against the calling method.
+
+        Usage counts against the context's budget when one is given. If the
+        call still fails after retries, the next model on the route is tried.
+        A prompt identical to one already in flight for the same model waits
+        for that call and shares its response; only the caller that made the
+        call is charged for it. The call's estimated usage is reserved against
+        the budget while it runs, so a fan-out can't overshoot it.
+        """
+        tracker = self._tracker(context)
+        tracker.check_budget()
+        prompt_tokens = estimate_tokens(str(prompt))
+        last_error = None
+        for model in self.router.candidates(call_type):
+            def call(model=model):
+                start = time.time()
+                try:
+                    response = self.caller.call(
+                        self._client_for(model).invoke, prompt,
+                        # A losing hedge is still billed, so account for it too
+                        on_discarded=lambda discarded: tracker.record_response(call_type, model, discarded),
+                        latency_key=(model, call_type)
+                    )
+                except Exception as e:
+                    self.router.record_failure(model, e)
+                    raise
+                self.router.record_success(model)
+                tracker.record_response(call_type, model, response, latency=time.time() - start)
+                return response
+            reservation = tracker.reserve(model, prompt_tokens)
+            try:
+                return self.single_flight.do((model, str(prompt)), call)
+            except Exception as e:
+                print(f"Model {model} failed for {call_type}: {e}")
+                last_error = e
+            finally:
+                tracker.release(reservation)
+        raise last_error
+    
+    def _run_chain(self, retriever, query, call_type, context=None, chains=None):
+        """Run a RetrievalQA chain with the model routed for the call type.
+
+        Like _invoke, model health is recorded and, if a call still fails
+        after retries, the chain is rebuilt on the next model on the route.
+        Pass a dict as `chains` to reuse the chains built per model across
+        queries on the same retriever.
+        """
+        from langchain.chains import RetrievalQA
+        tracker = self._tracker(context)
+        tracker.check_budget()
+        prompt_tokens = estimate_tokens(query) + CHAIN_CONTEXT_TOKENS
+        chains = {} if chains is None else chains
+        last_error = None
+        for model in self.router.candidates(call_type):
+            if model not in chains:
+                chains[model] = RetrievalQA.from_chain_type(
+                    llm=self._client_for(model),
+                    chain_type="stuff",
+                    retriever=retriever,
+                    return_source_documents=False
+                )
+            reservation = tracker.reserve(model, prompt_tokens)
+            try:
+                result = self.caller.call(
+                    chains[model].run, query, callbacks=self._chain_callbacks(call_type, model, context),
+                    latency_key=(model, call_type)
+                )
+            except Exception as e:
+                print(f"Model {model} failed for {call_type}: {e}")
+                self.router.record_failure(model, e)
+                last_error = e
+                continue
+            finally:
+                tracker.release(reservation)
+            self.router.record_success(model)
+            return result
+        raise last_error
+    
+    def _chain_callbacks(self, call_type, model, context=None):
+        """Callbacks that record usage of LLM calls made inside langchain chains."""
+        if not LANGCHAIN_CALLBACKS_AVAILABLE:
+            return []
+        return [usage_callback_handler(self._tracker(context), call_type, model)]
     
     def _test_api_connection(self):
         """Test if the API key and connection work."""
         try:
             print("Testing API connection...")
-            test_response = self.llm_client.invoke("Say 'API test successful'")
+            test_response = self._invoke("Say 'API test successful'", "_test_api_connection")
             if "successful" in test_response.content.lower():
                 print("✅ API connection test passed")
             else:
                 print("⚠️ API connection test returned unexpected response")
+            return True
         except Exception as e:
             print(f"❌ API connection test failed: {e}")
             raise Exception(f"API connection failed: {e}")
 
-    def extract_text_from_pdf(self, pdf_file):
-        """Extract text from a PDF file."""
+    def extract_document(self, file):
+        """Extract text from an upload or file path, detecting its format from the content.
 
+        PDF, DOCX, HTML and TXT are supported (see extraction.py). Raises
+        ExtractionError if the file can't be read, is unsupported, or breaks
+        the agent's extraction limits.
+        """
+        filename = file.name if hasattr(file, 'name') else os.path.basename(str(file))
         try:
-            if hasattr(pdf_file,'getvalue'):
-                pdf_data=pdf_file.getvalue()
-                pdf_file_like=io.BytesIO(pdf_data)
-                reader = PyPDF2.PdfReader(pdf_file_like)
+            if hasattr(file, 'getvalue'):
+                data = file.getvalue()
             else:
-                reader = PyPDF2.PdfReader(pdf_file)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text()
+                with open(file, 'rb') as handle:
+                    data = handle.read()
+        except OSError as e:
+            raise ExtractionError("unreadable", f"Could not read file: {e}", filename)
+        return extract_document(data, filename, self.extraction_limits)
 
-            return text
-        except Exception as e:
-            print(f"Error extracting text from PDF: {e}")
-            return ""   
-    def extract_text_from_txt(self, txt_file):
-        """Extract text from a TXT file."""
+    def extract_clean_text(self, file):
+        """Extract a document and strip layout noise (see extraction.normalize_text).
+
+        Returns the text and a report of the characters and estimated tokens
+        saved, which every prompt embedding the text no longer pays for.
+        """
+        return normalize_text(self.extract_document(file))
+
+    def extract_text_from_file(self, file):
+        """Extract text from a file, or return "" if it can't be extracted."""
         try:
-            if hasattr(txt_file,'getvalue'):
-                text=txt_file.getvalue().decode('utf-8')
-            else:
-                with open(txt_file, 'r', encoding='utf-8') as file:
-                    text = file.read()
-            return text
-        except Exception as e:
-            print(f"Error extracting text from TXT: {e}")
+            return self.extract_document(file)
+        except ExtractionError as e:
+            print(f"Error extracting text: {e}")
             return ""
-    
-    def extract_text_from_file(self, file):
-        """Extract text from a file based on its type."""
-        if hasattr(file,'name'):
-            file_extension = file.name.split('.')[-1].lower()
-        else:
-            file_extension = file.split('.')[-1].lower()
-        if file_extension == 'pdf':
-            return self.extract_text_from_pdf(file)
-        elif file_extension == 'txt':
-            return self.extract_text_from_txt(file)
 
-        else:
-            print("Unsupported file format. Please upload a PDF or TXT file.")
-            return ""
+    def extract_text_from_pdf(self, pdf_file):
+        """Extract text from a PDF file."""
+        return self.extract_text_from_file(pdf_file)
+
+    def extract_text_from_txt(self, txt_file):
+        """Extract text from a TXT file."""
+        return self.extract_text_from_file(txt_file)
     
     def create_rag_vector_store(self, text):
         """Create a RAG vector store from the provided text."""
@@ -179,10 +476,9 @@ class ResumeAnalysisAgent:
                 print("Warning: No valid OpenAI API key provided. Vector store creation skipped.")
                 return None
                 
-            text_splitter = RecursiveCharacterTextSplitter(separator="\n", chunk_size=1000, chunk_overlap=200, length_function=len,)
-            chunks = text_splitter.split_text(text)
-            embeddings = OpenAIEmbeddings(api_key=self.openai_api_key)
-            vectorstore = FAISS.from_texts(chunks, embeddings)
+            from langchain_community.vectorstores import FAISS
+            chunks = self._text_splitter().split_text(text)
+            vectorstore = FAISS.from_texts(chunks, self._embeddings())
             return vectorstore
         except Exception as e:
             print(f"Error creating RAG vector store: {e}")
@@ -194,123 +490,261 @@ class ResumeAnalysisAgent:
             return None
             
         try:
-            text_splitter = RecursiveCharacterTextSplitter(separator="\n", chunk_size=1000, chunk_overlap=200, length_function=len,)
-            chunks = text_splitter.split_text(text)
-            embeddings = OpenAIEmbeddings(api_key=self.openai_api_key)
-            vectorstore = FAISS.from_texts(chunks, embeddings)
+            from langchain_community.vectorstores import FAISS
+            chunks = self._text_splitter().split_text(text)
+            vectorstore = FAISS.from_texts(chunks, self._embeddings())
             return vectorstore
         except Exception as e:
             print(f"Error creating vector store: {e}")
             return None
     
-    def analyze_skill(self, qa_chain, skill):
-        """Analyze a specific skill using the QA chain."""
+    def prescore_skills(self, vectorstore, skills):
+        """Embedding evidence per skill for a resume's vector store, or {} if it can't be computed.
+
+        The chunk embeddings already in the store are reused, so only skills
+        not seen before are embedded.
+        """
+        try:
+            index = vectorstore.index
+            chunk_vectors = index.reconstruct_n(0, index.ntotal)
+            chunks = [
+                vectorstore.docstore.search(vectorstore.index_to_docstore_id[i]).page_content
+                for i in range(index.ntotal)
+            ]
+            return self._prescorer().prescore([chunks], skills, chunk_vectors)[0]
+        except Exception as e:
+            print(f"Skill pre-scoring skipped: {e}")
+            return {}
+    
+    def prescore_candidates(self, resume_texts, skills):
+        """Pre-score a candidate pool against skills from embeddings alone, with no LLM call.
+
+        All chunks are embedded in one request and scored with one matrix
+        product. Returns one dict per resume mapping each skill to its
+        similarity, 0-10 evidence score and top snippets, or None when
+        embeddings are unavailable.
+        """
+        if not LANGCHAIN_AVAILABLE or not self.openai_api_key or self.openai_api_key == "dummy_key":
+            print("Warning: Embeddings not available. Skill pre-scoring skipped.")
+            return None
+        splitter = self._text_splitter()
+        return self._prescorer().prescore([splitter.split_text(text) for text in resume_texts], skills)
+    
+    def analyze_skill(self, retriever, skill, context=None, chains=None):
+        """Analyze a specific skill with a retrieval QA chain over the resume."""
         query = f"Does the resume mention the skill '{skill}'? Provide numeric rating on a scale of 0-10 ,followed by reasoning."
-        result = qa_chain.run(query)
+        result = self._run_chain(retriever, query, "analyze_skill", context, chains)
         match = re.search(r"(\d{1,2})", result)
         score = int(match.group(1)) if match else 0
 
         reasoning = result.split('.', 1)[1].strip() if '.' in result and len(result.split('.', 1)) > 1 else "No reasoning provided."
         return skill, min(score, 10), reasoning
     
-    def direct_skill_analysis(self, resume_text, skills):
-        """Perform direct skill analysis without vector store (fallback method)."""
+    def _resume_for_prompt(self, context, call_type, resume_text=None):
+        """Compact resume text holding only the sections a call type needs.
+
+        Uses the sections parsed once for the analysis; text that isn't the
+        context's resume is parsed on the spot (it's local and cheap).
+        """
+        if context is not None and (resume_text is None or resume_text == context.resume_text):
+            sections = context.sections or parse_resume(context.resume_text)
+        else:
+            sections = parse_resume(resume_text)
+        return resume_for_prompt(sections, call_type)
+    
+    def analyze_skill_direct(self, resume_text, skill, context=None):
+        """Analyze a specific skill by prompting the LLM with the resume text."""
+        resume_content = self._resume_for_prompt(context, "direct_skill_analysis", resume_text)
+        prompt = f"""
+        Analyze the following resume text for the skill '{skill}'. 
+        Provide a numeric rating from 0-10 based on how well the resume demonstrates this skill.
+        Consider:
+        - Direct mentions of the skill
+        - Related experience and projects
+        - Depth of experience indicated
+        
+        Resume Text:
+        {resume_content}
+        
+        Respond with only a number (0-10) followed by a brief explanation.
+        Format: "Score: X - Explanation"
+        """
+        
+        response = self._invoke(prompt, "direct_skill_analysis", context)
+        result_text = response.content
+        print(f"Response for {skill}: {result_text[:100]}...")
+        
+        # Extract score
+        match = re.search(r"(\d{1,2})", result_text)
+        score = int(match.group(1)) if match else 0
+        score = min(score, 10)
+        
+        # Extract reasoning
+        reasoning = result_text.split('-', 1)[1].strip() if '-' in result_text else "Direct text analysis"
+        
+        print(f"Score for {skill}: {score}/10")
+        return skill, score, reasoning
+    
+    def _resume_memo(self, resume_text):
+        """Return the skill memo for a resume and its near-duplicate match, if any.
+
+        The resume is added to the near-duplicate index. When an earlier
+        resume is close enough to count as unchanged, its per-skill results
+        are reused for skills this resume has no result for yet, as long as
+        both resumes name the skill on the same lines.
+        """
+        fingerprint = resume_fingerprint(resume_text)
+        match = self.near_duplicates.check(fingerprint, resume_text) if self.near_duplicates is not None else None
+        if match:
+            kind = "identical to" if match["exact"] else f"{match['similarity']:.0%} similar to"
+            print(f"Resubmission detected: resume is {kind} an earlier one")
+        if not self.skill_cache:
+            return None, match
+        fallback = match["key"] if match and not match["exact"] and match["similarity"] >= REUSE_THRESHOLD else None
+        return self.skill_cache.for_resume(fingerprint, fallback, resume_text), match
+    
+    def _max_workers(self, num_tasks):
+        """Thread pool size for fanning out LLM calls; the shared limiter sets the real concurrency."""
+        return max(1, min(num_tasks, self.limiter.max_limit))
+    
+    def _result_stores(self, context):
+        """Stores consulted for per-skill results: the job checkpoint, then the resume memo."""
+        if not context:
+            return []
+        return [store for store in (context.checkpoint, context.skill_memo) if store]
+    
+    def _load_result(self, context, kind, skill):
+        """Return a saved per-skill result, copying memo hits into the checkpoint."""
+        stores = self._result_stores(context)
+        for index, store in enumerate(stores):
+            saved = store.get(kind, skill)
+            if saved:
+                for earlier in stores[:index]:
+                    earlier.put(kind, skill, saved)
+                return saved
+        return None
+    
+    def _save_result(self, context, kind, skill, data):
+        for store in self._result_stores(context):
+            store.put(kind, skill, data)
+    
+    def _score_skill(self, context, skill, score_fn, local_fn=None, failed=None):
+        """Score one skill, reusing a checkpointed or memoized score if there is one.
+
+        Failed calls score 0, are added to `failed` and are not saved, so they
+        are retried when the job is retried or the resume is analyzed again.
+        A score from `local_fn` (an estimate made without the LLM) is used when
+        it returns one, but is not saved either, so it never stands in for an
+        LLM score.
+        """
+        saved = self._load_result(context, "score", skill)
+        if saved:
+            print(f"Reusing saved score for {skill}: {saved['score']}/10")
+            return skill, saved["score"], saved["reasoning"]
+        local = local_fn(skill) if local_fn else None
+        if local:
+            return local
+        try:
+            skill, score, reasoning = score_fn(skill)
+        except BudgetExceeded:
+            raise
+        except Exception as skill_error:
+            print(f"Error analyzing skill {skill}: {skill_error}")
+            if failed is not None:
+                failed.append(skill)
+            # Assign default score if individual skill analysis fails
+            return skill, 0, f"Error analyzing skill: {skill_error}"
+        self._save_result(context, "score", skill, {"score": score, "reasoning": reasoning})
+        return skill, score, reasoning
+    
+    def _score_skills(self, context, skills, score_fn, local_fn=None):
+        """Score all skills concurrently, preserving their order.
+
+        Returns the (skill, score, reasoning) results and the skills whose
+        call failed and were scored 0. Raises BudgetExceeded if the calls
+        together went over the budget.
+        """
+        failed = []
+        with ThreadPoolExecutor(max_workers=self._max_workers(len(skills))) as executor:
+            results = list(executor.map(
+                lambda skill: self._score_skill(context, skill, score_fn, local_fn, failed), skills
+            ))
+        self._tracker(context).check_budget()
+        return results, [skill for skill in skills if skill in failed]
+    
+    def _evidence_fn(self, evidence):
+        """local_fn for _score_skills: scores skills with no embedding evidence without the LLM."""
+        def local_fn(skill):
+            if skill in evidence and not evidence[skill]["needs_llm"]:
+                return skill, evidence[skill]["evidence"], (
+                    f"No evidence of this skill found in the resume "
+                    f"(best similarity {evidence[skill]['similarity']:.2f})"
+                )
+            return None
+        return local_fn
+    
+    def direct_skill_analysis(self, resume_text, skills, context=None, evidence=None):
+        """Perform direct skill analysis without a retrieval chain (fallback method).
+
+        With embedding `evidence` (see prescore_skills), skills below the
+        evidence floor are scored locally instead of by the LLM.
+        """
         try:
             print(f"Starting direct skill analysis for {len(skills)} skills...")
-            skills_scores = {}
-            skill_reasoning = {}
-            missing_skills = []
-            total_score = 0
-            
-            for i, skill in enumerate(skills):
-                print(f"Analyzing skill {i+1}/{len(skills)}: {skill}")
-                
-                prompt = f"""
-                Analyze the following resume text for the skill '{skill}'. 
-                Provide a numeric rating from 0-10 based on how well the resume demonstrates this skill.
-                Consider:
-                - Direct mentions of the skill
-                - Related experience and projects
-                - Depth of experience indicated
-                
-                Resume Text:
-                {resume_text[:2000]}...
-                
-                Respond with only a number (0-10) followed by a brief explanation.
-                Format: "Score: X - Explanation"
-                """
-                
-                try:
-                    response = self.llm_client.invoke(prompt)
-                    result_text = response.content
-                    print(f"Response for {skill}: {result_text[:100]}...")
-                    
-                    # Extract score
-                    match = re.search(r"(\d{1,2})", result_text)
-                    score = int(match.group(1)) if match else 0
-                    score = min(score, 10)
-                    
-                    # Extract reasoning
-                    reasoning = result_text.split('-', 1)[1].strip() if '-' in result_text else "Direct text analysis"
-                    
-                    skills_scores[skill] = score
-                    skill_reasoning[skill] = reasoning
-                    total_score += score
-                    
-                    if score <= 5:
-                        missing_skills.append(skill)
-                        
-                    print(f"Score for {skill}: {score}/10")
-                    
-                except Exception as skill_error:
-                    print(f"Error analyzing skill {skill}: {skill_error}")
-                    # Assign default score if individual skill analysis fails
-                    skills_scores[skill] = 0
-                    skill_reasoning[skill] = f"Error analyzing skill: {skill_error}"
-                    missing_skills.append(skill)
-            
-            if not skills_scores:
+            results, failed = self._score_skills(
+                context, skills, lambda skill: self.analyze_skill_direct(resume_text, skill, context),
+                self._evidence_fn(evidence) if evidence else None
+            )
+            if not results:
                 print("No skills were successfully analyzed")
                 return None
             
-            overall_score = int((total_score / (len(skills) * 10)) * 100)
-            selected = overall_score >= self.cutoff_score
-            
-            strengths = [skill for skill, score in skills_scores.items() if score > 7]
-            improvement_areas = missing_skills if not selected else []
-            
-            self.resume_strengths = strengths
-            
-            print(f"Analysis complete. Overall score: {overall_score}%")
-            
-            return {
-                "overall_score": overall_score,
-                "skills_scores": skills_scores,
-                "skill_reasoning": skill_reasoning,
-                "selected": selected,
-                "reasoning": "Candidate evaluated using direct text analysis (no vector embeddings)",
-                "missing_skills": missing_skills,
-                "improvement_areas": improvement_areas
-            }
+            result = score_summary(
+                results, "Candidate evaluated using direct text analysis (no vector embeddings)", self.cutoff_score
+            )
+            result["failed_skills"] = failed
+            if evidence:
+                result["skill_evidence"] = evidence
+            print(f"Analysis complete. Overall score: {result['overall_score']}%")
+            return result
             
+        except BudgetExceeded:
+            raise
         except Exception as e:
             print(f"Error in direct skill analysis: {e}")
             import traceback
             traceback.print_exc()
             return None
-    def analyze_resume_weaknesses(self):
+    def analyze_resume_weaknesses(self, context=None):
         """Analyze the resume for weaknesses based on the job description."""
-        if not self.resume_text or not self.extracted_skills or not self.analysis_result:
+        context = context or self.context
+        if not context or not context.resume_text or not context.skills or not context.result:
             return []
         weaknesses = []
-        for skill in self.analysis_result.get('missing_skills', []):
-            prompt= f"""
+        for skill in context.result.get('missing_skills', []):
+            saved = self._load_result(context, "weakness", skill)
+            if saved:
+                print(f"Reusing saved weakness analysis for {skill}")
+                # The memo may come from an earlier run with a differently spelled skill
+                weakness_detail = dict(saved, skill=skill, score=context.result['skills_scores'].get(skill, 0))
+            else:
+                weakness_detail = self.analyze_skill_weakness(skill, context)
+                self._save_result(context, "weakness", skill, weakness_detail)
+            weaknesses.append(weakness_detail)
+        return weaknesses
+    
+    def analyze_skill_weakness(self, skill, context=None):
+        """Analyze why the resume is weak in one skill and how to improve it."""
+        context = context or self.context
+        resume_content = self._resume_for_prompt(context, "analyze_resume_weaknesses")
+        prompt= f"""
             Analyze why the resume is weak in demonstrating in "{skill}".
             For your analysis,consider:
             1.what is missing from the resume regarding this skill?
             2.How could it be improved with specific example?
             3.What specific action items would make this skill stand out?
-            Resume Content: {self.resume_text[:3000]}...
+            Resume Content:
+            {resume_content}
             Provide your response in json format:
             {{
             "weakness":"A concise description of what's missing or problematic(1-2 sentences)",
@@ -323,40 +757,44 @@ class ResumeAnalysisAgent:
             Return only valid JSON,no other text.
 
             """
-            response = self.llm_client.invoke(prompt)
-            weakness_content = response.content
-            try:
-                weakness_data = json.loads(weakness_content)
-                weakness_detail={
-                    "skill":skill,
-                    "score":self.analysis_result['skills_scores'].get(skill, 0),
-                    "detail": weakness_data.get("weakness", "No specific details provided."),
-                    "suggestions": weakness_data.get("improvement_suggestions", []),
-                    "example": weakness_data.get("example_addition", "No specific example provided")
-                }
-                weaknesses.append(weakness_detail)
-
-                self.improvement_suggestions[skill] = {
-                    "suggestions": weakness_data.get("improvement_suggestions", []),
-                    "example": weakness_data.get("example_addition", "No specific example provided")
-                }
-            except json.JSONDecodeError:
-                weaknesses.append({
-                    "skill": skill,
-                    "score": self.analysis_result['skills_scores'].get(skill, 0),
-                    "detail": weakness_content[:200] if weakness_content else "No details available"
-                })
-        self.resume_weaknesses = weaknesses
-        return weaknesses
-    def extract_skills_from_jd(self, jd_text):
+        response = self._invoke(prompt, "analyze_resume_weaknesses", context)
+        weakness_content = response.content
+        try:
+            weakness_data = json.loads(weakness_content)
+            return {
+                "skill":skill,
+                "score":context.result['skills_scores'].get(skill, 0),
+                "detail": weakness_data.get("weakness", "No specific details provided."),
+                "suggestions": weakness_data.get("improvement_suggestions", []),
+                "example": weakness_data.get("example_addition", "No specific example provided")
+            }
+        except json.JSONDecodeError:
+            return {
+                "skill": skill,
+                "score": context.result['skills_scores'].get(skill, 0),
+                "detail": weakness_content[:200] if weakness_content else "No details available"
+            }
+    def extract_skills_from_jd(self, jd_text, context=None):
         """Extract skills from the job description text."""
+        jd_key = resume_fingerprint(jd_text)
+        if self.skill_cache:
+            saved = self.skill_cache.get(jd_key, "jd_skills", "")
+            if saved:
+                print("Reusing skills extracted from the same job description")
+                return list(saved)
+        skills = self._extract_skills_from_jd(jd_text, context)
+        if skills and self.skill_cache:
+            self.skill_cache.put(jd_key, "jd_skills", "", skills)
+        return skills
+    
+    def _extract_skills_from_jd(self, jd_text, context=None):
         try:
             prompt = f"""Extract a comprehensive list of technical skills,technology,and
             competencies from the following job description.
             Format the output as a Python list of strings.Only include the list,nothing else.
             Job Description: {jd_text}
             """
-            response = self.llm_client.invoke(prompt)
+            response = self._invoke(prompt, "extract_skills_from_jd", context)
             skills_text=response.content
 
             match=re.search(r"\[(.*?)\]", skills_text, re.DOTALL)
@@ -382,140 +820,386 @@ class ResumeAnalysisAgent:
                     if skill:
                         skills.append(skill)
             return skills
+        except BudgetExceeded:
+            raise
         except Exception as e:
             print(f"Error extracting skills from JD: {e}")
             return []
     
-    def semantic_skill_analysis(self, resume_text, skills):
-        """Perform semantic skill analysis on the resume text."""
-        vectorstore = self.create_rag_vector_store(resume_text)
-        
-        # If vector store creation fails, use direct text analysis
-        if vectorstore is None:
-            return self.direct_skill_analysis(resume_text, skills)
-            
-        retriever = vectorstore.as_retriever()
-        qa_chain = RetrievalQA.from_chain_type(
-            llm=self.llm_client if GROQ_AVAILABLE else ChatGroq(model="qwen/qwen3-32b", api_key=self.groq_api_key, temperature=0),
-            chain_type="stuff",
-            retriever=retriever,
-            return_source_documents=False
-        )   
-        skills_scores = {}
-        skill_reasoning = {}
-        missing_skills = []
-        total_score = 0
-
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            results=list(executor.map(lambda skill: self.analyze_skill(qa_chain, skill), skills))
-        for skill, score, reasoning in results:
-            skills_scores[skill] = score
-            skill_reasoning[skill] = reasoning
-            total_score += score
-            if score <= 5:
-                missing_skills.append(skill)
-        overall_score=int((total_score / (len(skills) * 10)) * 100)
-        selected=overall_score >= self.cutoff_score
-
-        reasoning="Candidate evaluated based on explicit resume content using semantic similarity and clear numeric scoring"
-
-        strengths=[skill for skill, score in skills_scores.items() if score > 7]
-        improvement_areas=missing_skills if not selected else []
-
-        self.resume_strengths=strengths
+    def semantic_skill_analysis(self, resume_text, skills, context=None):
+        """Perform semantic skill analysis on the resume text.
 
-        return {
-            "overall_score": overall_score,
-            "skills_scores": skills_scores,
-            "skill_reasoning": skill_reasoning,
-            "selected": selected,
-            "reasoning": reasoning,
-            "missing_skills": missing_skills,
-            "improvement_areas": improvement_areas
-        }
-    def analyze_resume(self, resume_file, role_requirements=None, custom_jd=None):
-        """Analyze the resume against role requirements or a custom job description."""
+        Skills with no embedding evidence anywhere in the resume are scored
+        without the LLM, whether the skills are then scored with retrieval
+        chains or, without langchain-groq, with direct prompts.
+        """
+        if all(self._load_result(context, "score", skill) for skill in skills):
+            # Every score is already saved, so skip building the retrieval chain
+            score_fn = local_fn = None
+        else:
+            if context and resume_text == context.resume_text:
+                # The analysis already tried to build the store
+                vectorstore = context.vectorstore
+            else:
+                vectorstore = self.create_rag_vector_store(resume_text)
+            
+            # If vector store creation fails, use direct text analysis
+            if vectorstore is None:
+                return self.direct_skill_analysis(resume_text, skills, context)
+            
+            # The store's chunk embeddings are reused, so this costs no extra embedding of the resume
+            evidence = self.prescore_skills(vectorstore, skills)
+            if not GROQ_AVAILABLE:
+                # Retrieval chains need a langchain chat model
+                return self.direct_skill_analysis(resume_text, skills, context, evidence)
+                
+            retriever = vectorstore.as_retriever()
+            # Chains are built once per model and shared by every skill
+            chains = {}
+            local_fn = self._evidence_fn(evidence)
+            score_fn = lambda skill: self.analyze_skill(retriever, skill, context, chains)
+        results, failed = self._score_skills(context, skills, score_fn, local_fn)
+        result = score_summary(
+            results,
+            "Candidate evaluated based on explicit resume content using semantic similarity and clear numeric scoring",
+            self.cutoff_score
+        )
+        result["failed_skills"] = failed
+        if score_fn is not None and evidence:
+            result["skill_evidence"] = evidence
+        return result
+    def analyze(self, resume_file, role_requirements=None, custom_jd=None, checkpoint=None, usage_tracker=None):
+        """Analyze a resume and return its AnalysisContext, or None if it can't be analyzed.
+
+        Nothing is stored on the agent, so analyses may run concurrently.
+        Token usage is returned under result["usage"]; if the tracker's token
+        or cost budget runs out, BudgetExceeded is raised. Skills whose LLM
+        call failed score 0 and are listed under result["failed_skills"]. With a checkpoint
+        (see storage.JobQueue), each per-skill score and weakness result is
+        saved as it completes and reused on a re-run. Scores and weaknesses
+        are also memoized per resume fingerprint, so re-analyzing the same
+        resume against an edited skill list or JD only calls the LLM for the
+        skills that were added. A resume or JD that can't be extracted raises
+        ExtractionError.
+        """
+        usage_tracker = usage_tracker or UsageTracker(max_tokens=self.max_tokens, max_cost=self.max_cost)
         try:
             # Extract text from resume
             print("Extracting text from resume...")
-            self.resume_text = self.extract_text_from_file(resume_file)
+            resume_text, normalization = self.extract_clean_text(resume_file)
             
-            if not self.resume_text or len(self.resume_text.strip()) < 50:
+            if not resume_text or len(resume_text.strip()) < 50:
                 print("Error: Resume text is too short or empty")
                 return None
             
-            print(f"Resume text extracted: {len(self.resume_text)} characters")
-
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".txt", mode='w', encoding='utf-8') as tmp:
-                tmp.write(self.resume_text)
-                self.resume_file_path = tmp.name
-            
-            # Create vector store (optional)
-            self.rag_vectorstore = self.create_rag_vector_store(self.resume_text)
+            print(f"Resume text extracted: {len(resume_text)} characters "
+                  f"({normalization['chars_saved']} characters, ~{normalization['tokens_saved']} tokens of noise removed)")
+            skill_memo, near_duplicate = self._resume_memo(resume_text)
+            context = AnalysisContext(
+                resume_text=resume_text,
+                usage_tracker=usage_tracker,
+                checkpoint=checkpoint,
+                skill_memo=skill_memo,
+                sections=parse_resume(resume_text),
+                # Create vector store (optional)
+                vectorstore=self.create_rag_vector_store(resume_text)
+            )
 
             # Extract skills and analyze
             if custom_jd:
                 print("Extracting skills from job description...")
-                self.jd_text = self.extract_text_from_file(custom_jd)
-                if not self.jd_text:
+                jd_text, _ = self.extract_clean_text(custom_jd)
+                if not jd_text:
                     print("Error: Could not extract text from job description")
                     return None
-                self.extracted_skills = self.extract_skills_from_jd(self.jd_text)
+                context = replace(context, jd_text=jd_text, skills=self.extract_skills_from_jd(jd_text, context))
             elif role_requirements:
                 print("Using provided role requirements...")
-                self.extracted_skills = role_requirements
+                context = replace(context, skills=role_requirements)
             else:
                 print("Error: No skills or job description provided")
                 return None
             
-            if not self.extracted_skills:
+            if not context.skills:
                 print("Error: No skills extracted")
                 return None
                 
-            print(f"Skills to analyze: {self.extracted_skills}")
+            print(f"Skills to analyze: {context.skills}")
             
             # Perform skill analysis
             print("Starting skill analysis...")
-            self.analysis_result = self.semantic_skill_analysis(self.resume_text, self.extracted_skills)
+            result = self.semantic_skill_analysis(context.resume_text, context.skills, context)
             
-            if not self.analysis_result:
+            if not result:
                 print("Error: Skill analysis failed")
                 return None
             
             print("Skill analysis completed successfully")
+            result["text_normalization"] = normalization
+            result["near_duplicate"] = near_duplicate
+            result["resume_fingerprint"] = resume_fingerprint(resume_text)
+            result["industry_fit"] = get_industry_index().scores(resume_text)
+            context = replace(context, result=result)
             
             # Analyze weaknesses if needed
-            if self.analysis_result and "missing_skills" in self.analysis_result and self.analysis_result["missing_skills"]:
+            if result.get("missing_skills"):
                 print("Analyzing weaknesses...")
-                self.analyze_resume_weaknesses()
-                self.analysis_result["detailed_weaknesses"] = self.resume_weaknesses
+                context = replace(context, weaknesses=self.analyze_resume_weaknesses(context))
+                result["detailed_weaknesses"] = context.weaknesses
             
-            return self.analysis_result
+            result["usage"] = usage_tracker.summary()
+            print(f"Analysis used {result['usage']['total_tokens']} tokens")
+            # The checkpoint belongs to this run only
+            return replace(context, checkpoint=None, skill_memo=None)
             
+        except BudgetExceeded as e:
+            print(f"Analysis stopped: {e}")
+            raise
+        except ExtractionError as e:
+            print(f"Could not extract text: {e}")
+            raise
         except Exception as e:
             print(f"Error in analyze_resume: {e}")
             import traceback
             traceback.print_exc()
             return None
     
-    def ask_question(self, question):
+    def analyze_resume(self, resume_file, role_requirements=None, custom_jd=None, checkpoint=None):
+        """Analyze the resume against role requirements or a custom job description.
+
+        Like analyze(), but returns the result dict and keeps the context as
+        the agent's current analysis, which the follow-up methods (Q&A,
+        interview questions, resume improvement) use when no context is given.
+        """
+        context = self.analyze(resume_file, role_requirements=role_requirements, custom_jd=custom_jd,
+                               checkpoint=checkpoint)
+        if not context:
+            return None
+        self.context = context
+        return context.result
+    
+    def match_jobs(self, resume_file, job_descriptions, usage_tracker=None):
+        """Score one resume against many jobs and rank them.
+
+        `job_descriptions` maps a job name to a JD (upload or path) or to a
+        list of required skills. The resume is extracted, parsed and embedded
+        once, skills are taken from every JD (memoized per JD), and the union
+        of distinct skills is scored once; each job's result and the ranking
+        are derived from those shared scores. Weakness analysis is left to a
+        follow-up analyze() for the jobs worth pursuing. Returns None if the
+        resume has no usable text.
+        """
+        usage_tracker = usage_tracker or UsageTracker(max_tokens=self.max_tokens, max_cost=self.max_cost)
+        resume_text, normalization = self.extract_clean_text(resume_file)
+        if not resume_text or len(resume_text.strip()) < 50:
+            print("Error: Resume text is too short or empty")
+            return None
+        skill_memo, near_duplicate = self._resume_memo(resume_text)
+        context = AnalysisContext(
+            resume_text=resume_text,
+            usage_tracker=usage_tracker,
+            skill_memo=skill_memo,
+            sections=parse_resume(resume_text),
+            vectorstore=self.create_rag_vector_store(resume_text)
+        )
+        
+        errors = {}
+        def job_skills(item):
+            name, job = item
+            if isinstance(job, (list, tuple)):
+                return list(job)
+            try:
+                jd_text, _ = self.extract_clean_text(job)
+            except ExtractionError as e:
+                errors[name] = str(e)
+                return []
+            return self.extract_skills_from_jd(jd_text, context) if jd_text else []
+        
+        with ThreadPoolExecutor(max_workers=self._max_workers(len(job_descriptions))) as executor:
+            skills_per_job = dict(zip(job_descriptions, executor.map(job_skills, job_descriptions.items())))
+        
+        # Each distinct skill is scored once, however many jobs ask for it
+        unique_skills = {}
+        for skills in skills_per_job.values():
+            for skill in skills:
+                unique_skills.setdefault(normalize_skill(skill), skill)
+        print(f"Scoring {len(unique_skills)} distinct skills for {len(job_descriptions)} jobs")
+        scored = self.semantic_skill_analysis(resume_text, list(unique_skills.values()), context) if unique_skills else None
+        by_skill = {
+            normalize_skill(skill): (score, scored["skill_reasoning"][skill])
+            for skill, score in (scored["skills_scores"] if scored else {}).items()
+        }
+        
+        jobs = {}
+        for name, skills in skills_per_job.items():
+            distinct = {normalize_skill(skill): skill for skill in reversed(skills)}
+            results = [(skill, *by_skill[key]) for key, skill in reversed(distinct.items()) if key in by_skill]
+            if results:
+                jobs[name] = score_summary(results, scored["reasoning"], self.cutoff_score)
+            else:
+                jobs[name] = None
+                errors.setdefault(name, "No skills found for this job")
+        ranking = sorted(
+            ({"job": name, "overall_score": result["overall_score"], "selected": result["selected"]}
+             for name, result in jobs.items() if result),
+            key=lambda entry: entry["overall_score"], reverse=True
+        )
+        return {
+            "candidate": resume_file.name if hasattr(resume_file, 'name') else str(resume_file),
+            "skills_scored": len(by_skill),
+            "jobs": jobs,
+            "ranking": ranking,
+            "errors": errors,
+            "near_duplicate": near_duplicate,
+            "text_normalization": normalization,
+            "usage": usage_tracker.summary()
+        }
+    
+    def analyze_batch(self, resume_files, role_requirements=None, custom_jd=None, job_queue=None, batch_id=None,
+                      workers=1):
+        """Analyze several resumes against the same role requirements or job description.
+
+        The job description is only processed once. Returns per-candidate
+        results with their token usage, plus usage totals for the whole batch.
+        Up to `workers` candidates are analyzed at once on this agent.
+        With a job_queue (storage.JobQueue) every candidate is stored as a
+        durable job, so an interrupted batch can be finished with resume_batch.
+        As in analyze(), skills with no embedding evidence in a candidate's
+        resume are scored without the LLM; the evidence comes from the chunk
+        embeddings of that candidate's vector store, so no resume is embedded
+        twice (prescore_candidates is for ranking a pool without analyzing it).
+        """
+        batch_tracker = UsageTracker(max_tokens=self.max_tokens, max_cost=self.max_cost)
+        if custom_jd:
+            print("Extracting skills from job description...")
+            jd_text, _ = normalize_text(self.extract_text_from_file(custom_jd))
+            jd_context = AnalysisContext(resume_text="", jd_text=jd_text, usage_tracker=batch_tracker)
+            role_requirements = self.extract_skills_from_jd(jd_text, jd_context) if jd_text else None
+        if not role_requirements:
+            print("Error: No skills or job description provided")
+            return None
+        
+        if job_queue is not None:
+            batch_id = batch_id or uuid.uuid4().hex
+            for resume_file in resume_files:
+                candidate = resume_file.name if hasattr(resume_file, 'name') else str(resume_file)
+                # Store the extracted text so a resumed batch doesn't need the original files
+                payload = {"resume_text": "", "skills": role_requirements}
+                try:
+                    payload["resume_text"], _ = self.extract_clean_text(resume_file)
+                except ExtractionError as e:
+                    payload["extraction_error"] = e.to_dict()
+                job_queue.enqueue(batch_id, candidate, payload)
+            print(f"Queued {len(resume_files)} candidates as batch {batch_id}")
+            batch = self.resume_batch(job_queue, batch_id, workers=workers)
+            batch["usage"] = merge_usage_summaries([batch_tracker.summary(), batch["usage"]])
+            return batch
+        
+        def analyze_one(numbered):
+            number, resume_file = numbered
+            candidate = resume_file.name if hasattr(resume_file, 'name') else str(resume_file)
+            print(f"Analyzing candidate {number}/{len(resume_files)}: {candidate}")
+            return self._analyze_candidate(candidate, resume_file, role_requirements)
+        
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            candidates = list(executor.map(analyze_one, enumerate(resume_files, 1)))
+        
+        return {
+            "skills": role_requirements,
+            "candidates": candidates,
+            "usage": merge_usage_summaries([batch_tracker.summary()] + [c["usage"] for c in candidates])
+        }
+    
+    def _analyze_candidate(self, candidate, resume_file, role_requirements, checkpoint=None):
+        """Analyze one batch candidate, capturing a budget stop or unreadable file as an error instead of raising."""
+        tracker = UsageTracker(max_tokens=self.max_tokens, max_cost=self.max_cost)
+        error = None
+        try:
+            context = self.analyze(resume_file, role_requirements=role_requirements, checkpoint=checkpoint,
+                                   usage_tracker=tracker)
+            result = context.result if context else None
+        except (BudgetExceeded, ExtractionError) as e:
+            result = None
+            error = str(e)
+        return {
+            "candidate": candidate,
+            "result": result,
+            "usage": tracker.summary(),
+            "error": error
+        }
+    
+    def resume_batch(self, job_queue, batch_id, workers=1):
+        """Run (or finish) the queued jobs of a durable batch.
+
+        Jobs left running by a crashed process are requeued, as are failed
+        jobs with attempts left (a provider outage, a budget stop or a skill
+        whose call failed), and checkpointed per-skill results are reused so
+        no completed LLM call is repeated. A job with failed skills is kept
+        as failed, with its partial result, rather than completed with zero
+        scores. Up to `workers` jobs run at once; only one process should
+        resume a given batch at a time.
+        """
+        requeued = job_queue.requeue_interrupted(batch_id)
+        if requeued:
+            print(f"Requeued {requeued} interrupted jobs from batch {batch_id}")
+        retried = job_queue.requeue_failed(batch_id)
+        if retried:
+            print(f"Retrying {retried} failed jobs from batch {batch_id}")
+        
+        def drain():
+            while True:
+                job = job_queue.claim_next(batch_id)
+                if not job:
+                    return
+                if job["payload"].get("extraction_error"):
+                    # Extraction already failed when the batch was queued; retrying won't help
+                    job_queue.fail(
+                        job["job_id"], str(ExtractionError.from_dict(job["payload"]["extraction_error"])), retryable=False
+                    )
+                    continue
+                print(f"Analyzing candidate {job['candidate']} (attempt {job['attempts']})")
+                resume_file = UploadedDocument(f"{job['candidate']}.txt", job["payload"]["resume_text"].encode("utf-8"))
+                outcome = self._analyze_candidate(
+                    job["candidate"], resume_file, job["payload"]["skills"], checkpoint=job_queue.checkpoint(job["job_id"])
+                )
+                result = outcome["result"]
+                if result and not result.get("failed_skills"):
+                    job_queue.complete(job["job_id"], result)
+                elif result:
+                    job_queue.fail(job["job_id"], f"Scoring failed for: {', '.join(result['failed_skills'])}", result)
+                else:
+                    job_queue.fail(job["job_id"], outcome["error"] or "Analysis failed")
+        
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for future in [executor.submit(drain) for _ in range(max(1, workers))]:
+                future.result()
+        
+        jobs = job_queue.batch_jobs(batch_id)
+        candidates = [{
+            "candidate": job["candidate"],
+            "result": job["result"],
+            "usage": job["result"].get("usage") if job["result"] else None,
+            "error": job["error"]
+        } for job in jobs]
+        return {
+            "batch_id": batch_id,
+            "skills": jobs[0]["payload"]["skills"] if jobs else [],
+            "status": job_queue.batch_status(batch_id),
+            "candidates": candidates,
+            "usage": merge_usage_summaries([c["usage"] for c in candidates])
+        }
+    
+    def ask_question(self, question, context=None):
         """Ask a question about the resume using the RAG vector store or direct analysis."""
-        if not self.resume_text:
+        context = context or self.context
+        if not context or not context.resume_text:
             return "Please analyze a resume first."
         
         # If vector store is available, use it
-        if self.rag_vectorstore and LANGCHAIN_AVAILABLE:
+        if context.vectorstore and LANGCHAIN_AVAILABLE and GROQ_AVAILABLE:
             try:
-                retriever = self.rag_vectorstore.as_retriever(search_kwargs={"k":3})
-                qa_chain = RetrievalQA.from_chain_type(
-                    llm=self.llm_client if GROQ_AVAILABLE else ChatGroq(model="qwen/qwen3-32b", api_key=self.groq_api_key, temperature=0),
-                    chain_type="stuff",
-                    retriever=retriever,
-                    return_source_documents=False
-                )
-                response = qa_chain.run(question)
-                return response
+                retriever = context.vectorstore.as_retriever(search_kwargs={"k":3})
+                return self._run_chain(retriever, question, "ask_question", context)
             except Exception as e:
                 print(f"Error using vector store: {e}")
                 # Fall back to direct analysis
@@ -526,31 +1210,32 @@ class ResumeAnalysisAgent:
             Based on the following resume content, please answer this question: {question}
             
             Resume Content:
-            {self.resume_text}
+            {self._resume_for_prompt(context, "ask_question")}
             
             Provide a detailed and accurate answer based only on the information available in the resume.
             """
             
-            response = self.llm_client.invoke(prompt)
+            response = self._invoke(prompt, "ask_question", context)
             return response.content
         except Exception as e:
             return f"Error analyzing resume: {e}"
 
-    def generate_interview_questions(self, num_questions=5, difficulty="medium", question_types=None):
+    def generate_interview_questions(self, num_questions=5, difficulty="medium", question_types=None, context=None):
         """Generate interview questions based on the resume content."""
-        if not self.resume_text or not self.extracted_skills:
+        context = context or self.context
+        if not context or not context.resume_text or not context.skills:
             return []
         
         if question_types is None:
             question_types = ["technical", "behavioral", "situational"]
             
         try:
-            context = f"""
+            candidate_context = f"""
 Resume Content:
-{self.resume_text[:2000]}...
-Skills to focus on: {', '.join(self.extracted_skills[:10])}
-Strengths: {', '.join(self.resume_strengths[:5])}
-Areas for improvement: {', '.join(self.analysis_result.get('missing_skills', [])[:5])}
+{self._resume_for_prompt(context, "generate_interview_questions")}
+Skills to focus on: {', '.join(context.skills[:10])}
+Strengths: {', '.join(context.strengths[:5])}
+Areas for improvement: {', '.join(context.result.get('missing_skills', [])[:5])}
             """
 
             prompt = f"""
@@ -561,7 +1246,7 @@ For each question:
 2. Make the question specific to their background and skills.
 3. For coding questions, include a clear problem statement.
 
-{context}
+{candidate_context}
 
 Format your response as a JSON array of objects with the following structure:
 [
@@ -575,7 +1260,7 @@ Format your response as a JSON array of objects with the following structure:
 Return only valid JSON, no other text.
             """
 
-            response = self.llm_client.invoke(prompt)
+            response = self._invoke(prompt, "generate_interview_questions", context)
             try:
                 questions = json.loads(response.content)
                 return questions
@@ -584,268 +1269,222 @@ Return only valid JSON, no other text.
                 return [
                     {
                         "type": "technical",
-                        "question": f"Can you explain your experience with {self.extracted_skills[0] if self.extracted_skills else 'your main technical skill'}?",
-                        "focus_area": self.extracted_skills[0] if self.extracted_skills else "general"
+                        "question": f"Can you explain your experience with {context.skills[0] if context.skills else 'your main technical skill'}?",
+                        "focus_area": context.skills[0] if context.skills else "general"
                     }
                 ]
         except Exception as e:
             print(f"Error generating interview questions: {e}")
             return []
     
-    def generate_improved_resume(self, industry="Technology/Software", experience_level="Mid Level", resume_format="Modern Professional", enhancement_options=None):
+    def generate_improved_resume(self, industry="Technology/Software", experience_level="Mid Level", resume_format="Modern Professional", enhancement_options=None, context=None):
         """Generate an improved version of the resume based on analysis and preferences."""
-        if not self.resume_text or not self.analysis_result:
+        context = context or self.context
+        if not context or not context.resume_text or not context.result:
             return None
         
         if enhancement_options is None:
             enhancement_options = ["ATS Keyword Optimization", "Action Verb Enhancement"]
+        # Action verbs are rewritten locally afterwards rather than by the LLM
+        llm_options = [option for option in enhancement_options if option != "Action Verb Enhancement"]
+        llm_options_text = ', '.join(llm_options) or "General language and formatting polish"
         
         try:
             print("Generating improved resume...")
             
             # Create enhancement context
-            context = f"""
+            enhancement_context = f"""
 Original Resume:
-{self.resume_text}
+{self._resume_for_prompt(context, "generate_improved_resume")}
 
 Analysis Results:
-- Overall Score: {self.analysis_result.get('overall_score', 0)}%
-- Missing Skills: {', '.join(self.analysis_result.get('missing_skills', []))}
-- Strengths: {', '.join(self.resume_strengths)}
+- Overall Score: {context.result.get('overall_score', 0)}%
+- Missing Skills: {', '.join(context.result.get('missing_skills', []))}
+- Strengths: {', '.join(context.strengths)}
 
 Target Industry: {industry}
 Experience Level: {experience_level}
 Desired Format: {resume_format}
-Enhancement Options: {', '.join(enhancement_options)}
+Enhancement Options: {llm_options_text}
             """
             
             prompt = f"""
 You are a professional resume writer and career coach. Based on the provided resume analysis and requirements, create an improved version of the resume.
 
-{context}
+{enhancement_context}
 
 Requirements:
 1. Maintain all factual information from the original resume
 2. Enhance language and presentation based on the selected options
 3. Optimize for the target industry: {industry}
 4. Format appropriately for {experience_level}
-5. Apply the following enhancements: {', '.join(enhancement_options)}
+5. Apply the following enhancements: {llm_options_text}
 
 Please provide:
 1. The complete improved resume content
 2. A list of specific improvements made
-3. ATS optimization analysis
 
 Format your response as JSON:
 {{
     "content": "The complete improved resume text",
-    "improvements": ["List of specific improvements made"],
-    "ats_analysis": {{
-        "score": 85,
-        "improvement": 15,
-        "keywords_matched": 12,
-        "keywords_added": 5,
-        "readability": 8,
-        "recommendations": ["ATS recommendation 1", "ATS recommendation 2"]
-    }}
+    "improvements": ["List of specific improvements made"]
 }}
 
 Return only valid JSON, no other text.
             """
             
-            response = self.llm_client.invoke(prompt)
+            response = self._invoke(prompt, "generate_improved_resume", context)
             
             try:
                 improved_resume = json.loads(response.content)
                 print("Improved resume generated successfully")
-                return improved_resume
             except json.JSONDecodeError:
                 print("Failed to parse JSON response, creating fallback response")
                 # Fallback response if JSON parsing fails
-                return {
+                improved_resume = {
                     "content": response.content,
                     "improvements": [
                         "Enhanced professional language",
                         "Improved formatting and structure",
                         "Added industry-specific keywords"
-                    ],
-                    "ats_analysis": {
-                        "score": 80,
-                        "improvement": 10,
-                        "keywords_matched": 8,
-                        "keywords_added": 3,
-                        "readability": 7,
-                        "recommendations": [
-                            "Consider adding more quantified achievements",
-                            "Include additional industry-specific keywords"
-                        ]
-                    }
+                    ]
                 }
+            if "Action Verb Enhancement" in enhancement_options and isinstance(improved_resume.get("content"), str):
+                rewritten = self.enhance_with_action_verbs(improved_resume["content"])
+                if rewritten != improved_resume["content"]:
+                    improved_resume["content"] = rewritten
+                    improved_resume.setdefault("improvements", []).append("Replaced weak verbs with strong action verbs")
+            improved_resume["ats_analysis"] = self._compare_ats(
+                context, str(improved_resume.get("content", "")), industry
+            )
+            return improved_resume
         
         except Exception as e:
             print(f"Error generating improved resume: {e}")
             return None
     
-    def convert_to_markdown(self, resume_content):
-        """Convert resume content to markdown format."""
-        try:
-            prompt = f"""
-Convert the following resume content to well-formatted Markdown:
+    def _compare_ats(self, context, improved_content, industry):
+        """Local ATS scores of the improved resume against the original, for the same keywords."""
+        keywords = list(dict.fromkeys(list(context.skills) + self.get_industry_keywords(industry)))
+        before = analyze_ats(context.resume_text, keywords, context.sections, industry)
+        after = analyze_ats(improved_content, keywords, industry=industry)
+        return {
+            "score": after["score"],
+            "improvement": after["score"] - before["score"],
+            "keywords_matched": len(after["keywords_found"]),
+            "keywords_added": len(set(after["keywords_found"]) - set(before["keywords_found"])),
+            "readability": after["readability"],
+            "recommendations": after["recommendations"]
+        }
+    
+    def convert_to_markdown(self, resume_content, polish=False):
+        """Convert resume content to markdown format.
 
-{resume_content}
+        The local converter (resume_parser.resume_to_markdown) is used by
+        default; polish=True asks the LLM to refine its output instead. Results
+        are memoized by content hash, so converting the same resume again is
+        instant and free.
+        """
+        kind = "markdown_polished" if polish else "markdown"
+        key = content_hash(resume_content)
+        if self.skill_cache:
+            saved = self.skill_cache.get(key, kind, "")
+            if saved:
+                return saved["markdown"]
+        markdown = resume_to_markdown(resume_content)
+        if polish:
+            try:
+                markdown = self._polish_markdown(markdown)
+            except BudgetExceeded:
+                raise
+            except Exception as e:
+                # The local conversion is still a usable result, but don't memoize it as polished
+                print(f"Error polishing markdown: {e}")
+                return markdown
+        if self.skill_cache:
+            self.skill_cache.put(key, kind, "", {"markdown": markdown})
+        return markdown
+    
+    def _polish_markdown(self, markdown):
+        prompt = f"""
+Improve the formatting of the following Markdown resume:
+
+{markdown}
 
 Use proper Markdown formatting:
-- # for main sections
-- ## for subsections  
-- **bold** for emphasis
+- # for the candidate's name
+- ## for main sections
+- **bold** for job titles and organizations
 - - for bullet points
 - Proper spacing and structure
 
-Return only the Markdown content, no other text.
+Keep all content unchanged. Return only the Markdown content, no other text.
             """
-            
-            response = self.llm_client.invoke(prompt)
-            return response.content
-            
-        except Exception as e:
-            print(f"Error converting to markdown: {e}")
-            # Fallback: basic markdown conversion
-            lines = resume_content.split('\n')
-            markdown_lines = []
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    markdown_lines.append('')
-                elif line.isupper() and len(line) > 3:
-                    # Likely a section header
-                    markdown_lines.append(f'## {line.title()}')
-                elif line.endswith(':') and len(line.split()) <= 3:
-                    # Likely a subsection
-                    markdown_lines.append(f'### {line}')
-                elif line.startswith('•') or line.startswith('-'):
-                    # Bullet point
-                    markdown_lines.append(f'- {line[1:].strip()}')
-                else:
-                    markdown_lines.append(line)
-            
-            return '\n'.join(markdown_lines)
+        response = self._invoke(prompt, "convert_to_markdown")
+        return response.content
     
-    def analyze_ats_compatibility(self, resume_content, target_keywords=None):
-        """Analyze resume for ATS compatibility."""
+    def analyze_ats_compatibility(self, resume_content, target_keywords=None, context=None, llm_recommendations=False,
+                                  industry=None):
+        """Analyze resume for ATS compatibility.
+
+        Keyword matching, section checks, readability and layout red flags are
+        computed locally (see ats.analyze_ats), so this takes milliseconds and
+        costs no tokens. With llm_recommendations=True the LLM is asked for
+        free-text recommendations based on those findings, which are added to
+        the rule-based ones. With an industry, its missing keywords (see
+        get_industry_keywords) are recommended as well.
+        """
+        context = context or self.context
         if target_keywords is None:
-            target_keywords = self.extracted_skills or []
+            target_keywords = context.skills if context else []
+        sections = context.sections if context and resume_content == context.resume_text else None
+        report = analyze_ats(resume_content, target_keywords, sections, industry)
+        if not llm_recommendations:
+            return report
         
         try:
             prompt = f"""
-Analyze the following resume for ATS (Applicant Tracking System) compatibility:
+An ATS (Applicant Tracking System) check of the resume below found:
+- Score: {report['score']}/100
+- Keywords missing: {', '.join(report['keywords_missing']) or 'none'}
+- Standard sections missing: {', '.join(report['sections_missing']) or 'none'}
+- Readability: {report['readability']}/10
+- Format issues: {'; '.join(report['format_issues']) or 'none'}
 
 Resume Content:
-{resume_content}
-
-Target Keywords: {', '.join(target_keywords)}
-
-Provide analysis on:
-1. Keyword density and matching
-2. Format compatibility
-3. Readability score
-4. Specific recommendations for improvement
+{self._resume_for_prompt(context, "analyze_ats_compatibility", resume_content)}
 
-Format as JSON:
-{{
-    "score": 85,
-    "keywords_found": ["keyword1", "keyword2"],
-    "keywords_missing": ["keyword3", "keyword4"],
-    "format_issues": ["issue1", "issue2"],
-    "recommendations": ["rec1", "rec2"]
-}}
-
-Return only valid JSON.
+Give up to 5 specific recommendations to improve this resume's ATS compatibility.
+Format as a JSON array of strings. Return only valid JSON.
             """
             
-            response = self.llm_client.invoke(prompt)
-            
+            response = self._invoke(prompt, "analyze_ats_compatibility", context)
             try:
-                return json.loads(response.content)
+                suggestions = json.loads(response.content)
             except json.JSONDecodeError:
-                # Fallback analysis
-                keywords_found = [kw for kw in target_keywords if kw.lower() in resume_content.lower()]
-                keywords_missing = [kw for kw in target_keywords if kw.lower() not in resume_content.lower()]
-                
-                return {
-                    "score": min(85, int((len(keywords_found) / max(len(target_keywords), 1)) * 100)),
-                    "keywords_found": keywords_found,
-                    "keywords_missing": keywords_missing,
-                    "format_issues": [],
-                    "recommendations": [
-                        f"Add missing keywords: {', '.join(keywords_missing[:3])}",
-                        "Use standard section headers",
-                        "Quantify achievements with numbers"
-                    ]
-                }
-        
+                suggestions = [line.strip(" -*•") for line in response.content.splitlines() if line.strip(" -*•")]
+            report["recommendations"] = list(dict.fromkeys(report["recommendations"] + [str(s) for s in suggestions]))
+        except BudgetExceeded:
+            raise
         except Exception as e:
-            print(f"Error analyzing ATS compatibility: {e}")
-            return {
-                "score": 70,
-                "keywords_found": [],
-                "keywords_missing": target_keywords,
-                "format_issues": ["Unable to analyze"],
-                "recommendations": ["Please try again"]
-            }
+            print(f"Error getting ATS recommendations: {e}")
+        return report
     
     def get_industry_keywords(self, industry):
-        """Get industry-specific keywords for optimization."""
-        industry_keywords = {
-            "Technology/Software": [
-                "software development", "programming", "coding", "debugging", "testing",
-                "agile", "scrum", "DevOps", "cloud computing", "API", "database",
-                "full-stack", "frontend", "backend", "mobile development"
-            ],
-            "Healthcare/Medical": [
-                "patient care", "medical records", "HIPAA", "clinical", "diagnosis",
-                "treatment", "healthcare", "medical", "nursing", "pharmacy",
-                "EMR", "EHR", "medical terminology", "patient safety"
-            ],
-            "Finance/Banking": [
-                "financial analysis", "risk management", "compliance", "audit",
-                "investment", "portfolio", "banking", "credit", "loans",
-                "financial modeling", "budgeting", "forecasting", "regulatory"
-            ],
-            "Marketing/Sales": [
-                "digital marketing", "SEO", "SEM", "social media", "content marketing",
-                "lead generation", "sales funnel", "CRM", "campaign management",
-                "brand management", "market research", "analytics", "conversion"
-            ],
-            "Engineering": [
-                "design", "manufacturing", "quality control", "project management",
-                "CAD", "technical drawings", "specifications", "testing",
-                "process improvement", "safety", "compliance", "maintenance"
-            ]
-        }
-        
-        return industry_keywords.get(industry, [])
+        """Get industry-specific keywords for optimization (from data/industry_keywords.json)."""
+        return get_industry_index().keywords(industry)
+    
+    def industry_coverage(self, resume_text):
+        """Keyword coverage of a resume for every industry, in one local pass."""
+        return get_industry_index().coverage(resume_text)
     
     def enhance_with_action_verbs(self, text):
-        """Replace weak verbs with strong action verbs."""
-        action_verb_replacements = {
-            "did": "executed",
-            "made": "created",
-            "helped": "assisted",
-            "worked on": "developed",
-            "was responsible for": "managed",
-            "handled": "coordinated",
-            "dealt with": "resolved",
-            "used": "utilized",
-            "got": "achieved",
-            "did work": "performed"
-        }
-        
-        enhanced_text = text
-        for weak_verb, strong_verb in action_verb_replacements.items():
-            enhanced_text = enhanced_text.replace(weak_verb, strong_verb)
-        
-        return enhanced_text
+        """Replace weak verbs with strong action verbs (whole words only, see action_verbs.py)."""
+        return enhance_action_verbs(text)
+    
+    def enhance_with_action_verbs_batch(self, texts):
+        """Replace weak verbs with strong action verbs in many documents."""
+        return enhance_action_verbs_batch(texts)
     
     def quantify_achievements(self, text):
         """Add suggestions for quantifying achievements."""
@@ -874,7 +1513,7 @@ Format as JSON:
 Return only valid JSON.
             """
             
-            response = self.llm_client.invoke(prompt)
+            response = self._invoke(prompt, "quantify_achievements")
             
             try:
                 return json.loads(response.content)
@@ -1,16 +1,15 @@
 import streamlit as st
 import os
 import warnings
-import torch
 from dotenv import load_dotenv
-from agents import ResumeAnalysisAgent
+from agents import ResumeAnalysisAgent, apply_cutoff
+from llm import BudgetExceeded
+from extraction import ExtractionError
+from storage import get_shared_results_store, requisition_id
 from ui import setup_page, display_analysis_results, display_interview_questions, apply_Nightingale_theme
-import torch
 
 # Suppress warnings for cleaner output
 warnings.filterwarnings("ignore", category=UserWarning)
-warnings.filterwarnings("ignore", message=".*torch.*")
-torch.classes.__path__ = []
 
 # Load environment variables
 load_dotenv()
@@ -71,6 +70,31 @@ def main():
             help="Minimum overall score required for candidate selection"
         )
         
+        # Optional budgets
+        with st.expander("💰 Analysis Budget (Optional)"):
+            max_tokens = st.number_input(
+                "Max tokens per analysis",
+                min_value=0,
+                value=0,
+                step=1000,
+                help="Stop an analysis once it has used this many tokens. 0 means no limit."
+            )
+            max_cost = st.number_input(
+                "Max cost per analysis ($)",
+                min_value=0.0,
+                value=0.0,
+                step=0.01,
+                format="%.2f",
+                help="Stop an analysis once its estimated cost reaches this amount. 0 means no limit."
+            )
+        
+        # Persistent results
+        save_results = st.checkbox(
+            "💾 Save analyses to results store",
+            value=os.getenv("SAVE_RESULTS", "").lower() in ("1", "true", "yes"),
+            help="Keep each analysis in a local SQLite database so candidates can be queried later without re-running anything."
+        )
+        
         st.markdown("---")
         st.markdown("### 🎯 Nightingale Recruitment Agent")
         st.markdown("Advanced AI-powered recruitment analysis using Groq's lightning-fast LLM processing for comprehensive resume evaluation and interview preparation.")
@@ -80,16 +104,24 @@ def main():
         st.info("💡 Get your free Groq API key at: https://console.groq.com/")
         return
     
-    # Initialize the agent
-    try:
-        agent = ResumeAnalysisAgent(
-            groq_api_key=groq_api_key, 
-            openai_api_key=openai_api_key,
-            cutoff_score=cutoff_score
-        )
-    except Exception as e:
-        st.error(f"❌ Error initializing agent: {e}")
-        return
+    # Initialize the agent once per configuration; moving the cutoff slider
+    # only re-decides selection from the stored scores
+    agent_config = (groq_api_key, openai_api_key, max_tokens, max_cost)
+    if st.session_state.get('agent_config') != agent_config:
+        try:
+            st.session_state['base_agent'] = ResumeAnalysisAgent(
+                groq_api_key=groq_api_key, 
+                openai_api_key=openai_api_key,
+                cutoff_score=cutoff_score,
+                max_tokens=max_tokens or None,
+                max_cost=max_cost or None
+            )
+            st.session_state['agent_config'] = agent_config
+        except Exception as e:
+            st.error(f"❌ Error initializing agent: {e}")
+            return
+    agent = st.session_state['base_agent']
+    agent.cutoff_score = cutoff_score
     
     # Create tabs for different functionalities
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
@@ -110,8 +142,8 @@ def main():
             st.markdown("#### 📄 Upload Resume")
             resume_file = st.file_uploader(
                 "Choose resume file",
-                type=['pdf', 'txt'],
-                help="Upload your resume in PDF or TXT format",
+                type=['pdf', 'docx', 'html', 'htm', 'txt'],
+                help="Upload your resume in PDF, DOCX, HTML or TXT format",
                 key="resume_upload"
             )
         
@@ -126,8 +158,8 @@ def main():
             if analysis_type == "Upload Job Description":
                 jd_file = st.file_uploader(
                     "Choose job description file",
-                    type=['pdf', 'txt'],
-                    help="Upload job description in PDF or TXT format",
+                    type=['pdf', 'docx', 'html', 'htm', 'txt'],
+                    help="Upload job description in PDF, DOCX, HTML or TXT format",
                     key="jd_upload"
                 )
                 custom_skills = None
@@ -164,9 +196,26 @@ def main():
                         st.session_state['analysis_result'] = result
                         st.session_state['agent'] = agent
                         st.success("✅ Analysis completed successfully!")
+                        
+                        if save_results:
+                            requisition = requisition_id(skills=agent.extracted_skills, jd_text=agent.jd_text if jd_file else None)
+                            get_shared_results_store().save(
+                                candidate=resume_file.name,
+                                requisition=requisition,
+                                result=result,
+                                metadata={"job_description": jd_file.name if jd_file else None}
+                            )
+                            st.info(f"💾 Saved to results store under requisition {requisition}")
                     else:
                         st.error("❌ Analysis failed. Please check your inputs and try again.")
                 
+                except BudgetExceeded as e:
+                    st.error(f"💰 Analysis stopped: {e}")
+                    st.info("Increase the analysis budget in the sidebar to analyze this resume.")
+                
+                except ExtractionError as e:
+                    st.error(f"📄 Could not read {e.filename or 'the uploaded file'}: {e.message}")
+                
                 except Exception as e:
                     st.error(f"❌ Error during analysis: {e}")
                     st.error("Please check:")
@@ -178,7 +227,7 @@ def main():
         # Display results if available
         if 'analysis_result' in st.session_state:
             st.markdown("---")
-            display_analysis_results(st.session_state['analysis_result'])
+            display_analysis_results(apply_cutoff(st.session_state['analysis_result'], cutoff_score), cutoff_score)
         
     with tab2:
         st.subheader("💬 Resume Q&A")
@@ -446,7 +495,7 @@ def main():
                         st.metric(
                             "ATS Score",
                             f"{ats_analysis.get('score', 0)}%",
-                            delta=f"+{ats_analysis.get('improvement', 0)}%"
+                            delta=f"{ats_analysis.get('improvement', 0):+}%"
                         )
                     
                     with col2:
@@ -486,15 +535,22 @@ def main():
                                 mime="text/plain"
                             )
                         
-                        # Markdown download
-                        if st.button("📋 Download as Markdown", use_container_width=True):
-                            md_content = agent.convert_to_markdown(st.session_state['improved_resume'].get('content', ''))
-                            st.download_button(
-                                label="💾 Download MD",
-                                data=md_content,
-                                file_name="improved_resume.md",
-                                mime="text/markdown"
-                            )
+                        # Markdown download: converted locally and memoized, so this is instant on reruns
+                        polish_markdown = st.checkbox(
+                            "✨ Polish Markdown with AI",
+                            value=False,
+                            help="Uses an LLM call to refine the formatting of the Markdown export"
+                        )
+                        md_content = agent.convert_to_markdown(
+                            st.session_state['improved_resume'].get('content', ''), polish=polish_markdown
+                        )
+                        st.download_button(
+                            label="📋 Download as Markdown",
+                            data=md_content,
+                            file_name="improved_resume.md",
+                            mime="text/markdown",
+                            use_container_width=True
+                        )
                     
                     with col2:
                         st.markdown("**📄 Professional Formats**")
@@ -0,0 +1,263 @@
+import functools
+import json
+import os
+import re
+
+from resources import get_registry
+from resume_parser import match_heading, parse_resume
+
+
+# Score weights; when no target keywords are given the keyword share is spread over the rest
+KEYWORD_WEIGHT = 50
+SECTION_WEIGHT = 20
+READABILITY_WEIGHT = 10
+FORMAT_WEIGHT = 20
+FORMAT_ISSUE_PENALTY = 5
+
+REQUIRED_SECTIONS = ("experience", "education", "skills")
+RECOMMENDED_SECTIONS = ("summary",)
+MIN_WORDS = 200
+MAX_WORDS = 1200
+
+BOUNDARY_PATTERN = re.compile(r"[\w+#]")
+WORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z'+#.-]*")
+SENTENCE_PATTERN = re.compile(r"[.!?]+(?:\s|$)|\n\s*[-*•▪◦●■►]\s")
+VOWEL_GROUP_PATTERN = re.compile(r"[aeiouy]+")
+COLUMN_GAP_PATTERN = re.compile(r"\S(?: {4,}|\t+)\S")
+# Icon-font glyphs and symbols that ATS parsers turn into garbage
+SPECIAL_CHARACTER_PATTERN = re.compile(r"[\ue000-\uf8ff\u2600-\u27bf\U0001f300-\U0001faff]")
+
+
+class KeywordMatcher:
+    """Counts many keywords in one pass over a text.
+
+    All keywords are compiled into a single case-insensitive alternation,
+    longest first, with boundaries that also work for names like "C++",
+    ".NET" or "Node.js", and whitespace inside multi-word keywords matching
+    any run of spaces or line breaks. The alternation is a lookahead tried
+    at every word start, so overlapping keywords are all counted: "React
+    Native" also counts "React", and "regulatory compliance" also counts
+    "compliance".
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keyword.strip() for keyword in keywords if keyword and keyword.strip()))
+        self._canonical = {self._key(keyword): keyword for keyword in self.keywords}
+        # Shorter keywords that start a longer one as whole words, counted along with it
+        self._prefixes = {
+            key: [
+                keyword for other, keyword in self._canonical.items()
+                if len(other) < len(key) and key.startswith(other) and not BOUNDARY_PATTERN.match(key[len(other)])
+            ]
+            for key in self._canonical
+        }
+        alternatives = [
+            r"\s+".join(re.escape(part) for part in keyword.split())
+            for keyword in sorted(self.keywords, key=len, reverse=True)
+        ]
+        self.pattern = re.compile(
+            r"(?<![\w+#])(?=(" + "|".join(alternatives) + r")(?![\w+#]))", re.IGNORECASE
+        ) if alternatives else None
+
+    @staticmethod
+    def _key(text):
+        return " ".join(text.lower().split())
+
+    def count(self, text):
+        """Occurrences of each keyword in the text (0 for keywords that don't appear)."""
+        counts = dict.fromkeys(self.keywords, 0)
+        if self.pattern is not None:
+            for match in self.pattern.finditer(text):
+                key = self._key(match.group(1))
+                keyword = self._canonical.get(key)
+                if keyword is not None:
+                    counts[keyword] += 1
+                    for prefix in self._prefixes[key]:
+                        counts[prefix] += 1
+        return counts
+
+
+@functools.lru_cache(maxsize=256)
+def _matcher(keywords):
+    return KeywordMatcher(keywords)
+
+
+def keyword_matcher(keywords):
+    """Return a compiled matcher for a keyword list, reused across calls and batches."""
+    return _matcher(tuple(keywords or ()))
+
+
+INDUSTRY_KEYWORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "industry_keywords.json")
+
+
+class IndustryKeywordIndex:
+    """Keywords per industry, compiled into one matcher over all industries.
+
+    coverage() scans a resume once and reports, for every industry, which of
+    its keywords appear, so industry fit can be judged without an LLM call.
+    """
+
+    def __init__(self, industry_keywords):
+        self.industries = {industry: list(dict.fromkeys(keywords)) for industry, keywords in industry_keywords.items()}
+        self.matcher = KeywordMatcher(keyword for keywords in self.industries.values() for keyword in keywords)
+
+    @classmethod
+    def from_file(cls, path=None):
+        with open(path or INDUSTRY_KEYWORDS_PATH, encoding="utf-8") as handle:
+            return cls(json.load(handle))
+
+    def keywords(self, industry):
+        """Keywords of one industry, or an empty list for an unknown one."""
+        return list(self.industries.get(industry, []))
+
+    def coverage(self, text, counts=None):
+        """Matched and missing keywords plus coverage (0-1) per industry, best covered first.
+
+        Pass `counts` from an earlier count() on the same text to skip the scan.
+        """
+        counts = counts if counts is not None else self.matcher.count(text)
+        report = {}
+        for industry, keywords in self.industries.items():
+            matched = [keyword for keyword in keywords if counts.get(keyword)]
+            report[industry] = {
+                "coverage": round(len(matched) / len(keywords), 3) if keywords else 0.0,
+                "matched": matched,
+                "missing": [keyword for keyword in keywords if not counts.get(keyword)],
+            }
+        return dict(sorted(report.items(), key=lambda item: item[1]["coverage"], reverse=True))
+
+    def scores(self, text):
+        """Coverage percentage per industry, best covered first."""
+        return {industry: round(entry["coverage"] * 100) for industry, entry in self.coverage(text).items()}
+
+
+def get_industry_index(path=None):
+    """Return the process-wide industry keyword index (NIGHTINGALE_INDUSTRY_KEYWORDS overrides the data file)."""
+    path = path or os.getenv("NIGHTINGALE_INDUSTRY_KEYWORDS") or INDUSTRY_KEYWORDS_PATH
+    return get_registry().get("index", ("industry_keywords", path), lambda: IndustryKeywordIndex.from_file(path))
+
+
+def _syllables(word):
+    word = word.lower().rstrip("e") or word.lower()
+    return max(1, len(VOWEL_GROUP_PATTERN.findall(word)))
+
+
+def readability(text):
+    """Flesch reading ease of the text plus the averages it is computed from."""
+    words = WORD_PATTERN.findall(text)
+    if not words:
+        return {"words": 0, "sentences": 0, "avg_sentence_length": 0.0, "avg_syllables": 0.0, "flesch": 0.0}
+    # Resume bullets rarely end with a period, so each bullet or line counts as a sentence
+    sentences = max(1, len(SENTENCE_PATTERN.findall(text)), sum(1 for line in text.splitlines() if line.strip()))
+    avg_sentence_length = len(words) / sentences
+    avg_syllables = sum(_syllables(word) for word in words) / len(words)
+    flesch = 206.835 - 1.015 * avg_sentence_length - 84.6 * avg_syllables
+    return {
+        "words": len(words),
+        "sentences": sentences,
+        "avg_sentence_length": round(avg_sentence_length, 1),
+        "avg_syllables": round(avg_syllables, 2),
+        "flesch": round(max(0.0, min(100.0, flesch)), 1),
+    }
+
+
+def _format_issues(text, lines, contact, word_count):
+    issues = []
+    filled = [line for line in lines if line.strip()]
+    if filled and sum(1 for line in filled if COLUMN_GAP_PATTERN.search(line)) > len(filled) * 0.2:
+        issues.append("Multi-column or table layout detected; ATS parsers may read columns out of order")
+    if SPECIAL_CHARACTER_PATTERN.search(text):
+        issues.append("Icons or special symbols found; they are often dropped or garbled by ATS parsers")
+    if not contact.get("email"):
+        issues.append("No email address found")
+    if not contact.get("phone"):
+        issues.append("No phone number found")
+    if word_count < MIN_WORDS:
+        issues.append(f"Resume is short ({word_count} words); aim for at least {MIN_WORDS}")
+    elif word_count > MAX_WORDS:
+        issues.append(f"Resume is long ({word_count} words); aim for at most {MAX_WORDS}")
+    if any(len(line) > 300 for line in lines):
+        issues.append("Very long lines or paragraphs; break them into bullet points")
+    return issues
+
+
+def analyze_ats(text, keywords=None, sections=None, industry=None):
+    """Score a resume's ATS compatibility locally, without any LLM call.
+
+    Returns the score (0-100), found/missing keywords with their counts and
+    density (occurrences per 100 words), found/missing standard sections,
+    readability (Flesch reading ease and a 0-10 rating), layout red flags,
+    keyword coverage per industry and rule-based recommendations. With an
+    `industry`, its missing keywords are recommended too. Pass `sections`
+    (parse_resume output) to reuse an earlier parse.
+    """
+    keywords = list(keywords or [])
+    lines = text.splitlines()
+    sections = sections or parse_resume(text)
+
+    stats = readability(text)
+    word_count = stats["words"]
+    counts = keyword_matcher(keywords).count(text)
+    keywords_found = [keyword for keyword, count in counts.items() if count]
+    keywords_missing = [keyword for keyword, count in counts.items() if not count]
+    density = {
+        keyword: round(count * 100 / word_count, 2) if word_count else 0.0
+        for keyword, count in counts.items() if count
+    }
+
+    headings = {match_heading(line) for line in lines} - {None}
+    sections_found = [section for section in REQUIRED_SECTIONS + RECOMMENDED_SECTIONS if section in headings]
+    sections_missing = [section for section in REQUIRED_SECTIONS if section not in headings]
+    format_issues = _format_issues(text, lines, sections["contact"], word_count)
+
+    # Resumes read best around Flesch 30-60; dense jargon scores lower without being a problem
+    readability_rating = round(min(10.0, max(0.0, stats["flesch"] / 6 + 2)), 1)
+    parts = {
+        "sections": SECTION_WEIGHT * (1 - len(sections_missing) / len(REQUIRED_SECTIONS)),
+        "readability": READABILITY_WEIGHT * readability_rating / 10,
+        "format": max(0, FORMAT_WEIGHT - FORMAT_ISSUE_PENALTY * len(format_issues)),
+    }
+    if counts:
+        score = parts["sections"] + parts["readability"] + parts["format"] + KEYWORD_WEIGHT * len(keywords_found) / len(counts)
+    else:
+        score = sum(parts.values()) * 100 / (100 - KEYWORD_WEIGHT)
+
+    industry_coverage = get_industry_index().coverage(text)
+
+    recommendations = []
+    if keywords_missing:
+        recommendations.append(f"Add missing keywords where they truthfully apply: {', '.join(keywords_missing[:5])}")
+    if sections_missing:
+        recommendations.append(
+            "Use standard section headers: " + ", ".join(section.title() for section in sections_missing)
+        )
+    if industry in industry_coverage and industry_coverage[industry]["missing"]:
+        recommendations.append(
+            f"Consider {industry} keywords that fit your experience: "
+            + ", ".join(industry_coverage[industry]["missing"][:5])
+        )
+    if stats["avg_sentence_length"] > 25:
+        recommendations.append("Shorten long sentences into concise bullet points")
+    recommendations.extend(format_issues)
+
+    return {
+        "score": int(round(score)),
+        "keywords_found": keywords_found,
+        "keywords_missing": keywords_missing,
+        "keyword_counts": counts,
+        "keyword_density": density,
+        "sections_found": sections_found,
+        "sections_missing": sections_missing,
+        "readability": readability_rating,
+        "readability_stats": stats,
+        "format_issues": format_issues,
+        "industry_coverage": industry_coverage,
+        "recommendations": recommendations,
+    }
+
+
+def analyze_ats_batch(texts, keywords=None, industry=None):
+    """ATS reports for many resumes against the same keywords; the matchers are compiled once."""
+    keyword_matcher(keywords)
+    get_industry_index()
+    return [analyze_ats(text, keywords, industry=industry) for text in texts]
@@ -0,0 +1,165 @@
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from array import array
+
+from resources import get_registry
+from storage import connect
+
+
+NUM_PERMUTATIONS = 64
+NUM_BANDS = 16
+SHINGLE_SIZE = 3
+# Estimated Jaccard similarity at which a resume is flagged as a resubmission
+DUPLICATE_THRESHOLD = 0.8
+# Similarity at which the earlier resume's per-skill results are reused
+REUSE_THRESHOLD = 0.9
+
+TOKEN_PATTERN = re.compile(r"\w+")
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Hashes of the word n-grams of a text, ignoring case, punctuation and layout."""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) < size:
+        return {zlib.crc32(" ".join(tokens).encode("utf-8"))} if tokens else set()
+    return {zlib.crc32(" ".join(tokens[i:i + size]).encode("utf-8")) for i in range(len(tokens) - size + 1)}
+
+
+class NearDuplicateIndex:
+    """MinHash signatures of resume texts with LSH buckets for near-duplicate lookups.
+
+    Each text is reduced to a fixed-size signature of its word shingles; the
+    fraction of equal signature values estimates the Jaccard similarity of
+    two texts. Signatures are split into bands, and a lookup only compares
+    against texts that share a whole band, so its cost depends on the number
+    of similar texts rather than the size of the index. Signatures are kept
+    in memory and, if a path is given, in SQLite so they survive restarts.
+    """
+
+    def __init__(self, path=None, num_permutations=NUM_PERMUTATIONS, bands=NUM_BANDS, threshold=DUPLICATE_THRESHOLD):
+        if num_permutations % bands:
+            raise ValueError("num_permutations must be a multiple of bands")
+        self.num_permutations = num_permutations
+        self.bands = bands
+        self.rows = num_permutations // bands
+        self.threshold = threshold
+        # Fixed seed: signatures must stay comparable across processes and restarts
+        rng = random.Random(num_permutations)
+        self._permutations = [
+            (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_permutations)
+        ]
+        self.signatures = {}
+        self.buckets = [{} for _ in range(bands)]
+        self.lookups = 0
+        self.flagged = 0
+        self._lock = threading.Lock()
+        self.connection = connect(path) if path else None
+        if self.connection:
+            with self._lock, self.connection:
+                self.connection.execute("""
+                    CREATE TABLE IF NOT EXISTS near_duplicates (
+                        key TEXT PRIMARY KEY,
+                        num_permutations INTEGER NOT NULL,
+                        signature BLOB NOT NULL,
+                        created_at REAL NOT NULL
+                    )
+                """)
+                rows = self.connection.execute(
+                    "SELECT key, signature FROM near_duplicates WHERE num_permutations = ?", (num_permutations,)
+                ).fetchall()
+            for row in rows:
+                signature = array("Q")
+                signature.frombytes(row["signature"])
+                self._insert(row["key"], signature)
+
+    def signature(self, text):
+        """MinHash signature of a text."""
+        hashes = shingles(text)
+        if not hashes:
+            return array("Q", [_MAX_HASH] * self.num_permutations)
+        return array("Q", [
+            min((a * value + b) % _PRIME for value in hashes) & _MAX_HASH
+            for a, b in self._permutations
+        ])
+
+    def _band_keys(self, signature):
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def _insert(self, key, signature):
+        if key in self.signatures:
+            return
+        self.signatures[key] = signature
+        for buckets, band_key in zip(self.buckets, self._band_keys(signature)):
+            buckets.setdefault(band_key, []).append(key)
+
+    def add(self, key, text=None, signature=None):
+        """Index a text (or its precomputed signature) under a key, e.g. its resume fingerprint."""
+        signature = signature if signature is not None else self.signature(text)
+        with self._lock:
+            if key in self.signatures:
+                return
+            self._insert(key, signature)
+            if self.connection:
+                with self.connection:
+                    self.connection.execute(
+                        "INSERT OR IGNORE INTO near_duplicates (key, num_permutations, signature, created_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (key, self.num_permutations, signature.tobytes(), time.time())
+                    )
+
+    def query(self, text=None, signature=None, exclude=None):
+        """Return (key, similarity) of the most similar indexed text at or above the threshold, or None."""
+        signature = signature if signature is not None else self.signature(text)
+        best = None
+        with self._lock:
+            self.lookups += 1
+            candidates = set()
+            for buckets, band_key in zip(self.buckets, self._band_keys(signature)):
+                candidates.update(buckets.get(band_key, ()))
+            candidates.discard(exclude)
+            for key in candidates:
+                other = self.signatures[key]
+                similarity = sum(1 for x, y in zip(signature, other) if x == y) / self.num_permutations
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (key, similarity)
+        return best
+
+    def check(self, key, text):
+        """Flag a text on ingest and index it.
+
+        Returns {"key", "similarity", "exact"} for an earlier submission of
+        the same text (exact) or the most similar earlier text, or None if
+        it is new.
+        """
+        with self._lock:
+            exact = key in self.signatures
+        if exact:
+            match = {"key": key, "similarity": 1.0, "exact": True}
+        else:
+            signature = self.signature(text)
+            found = self.query(signature=signature, exclude=key)
+            self.add(key, signature=signature)
+            match = {"key": found[0], "similarity": round(found[1], 3), "exact": False} if found else None
+        if match:
+            with self._lock:
+                self.flagged += 1
+        return match
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self.signatures), "lookups": self.lookups, "flagged": self.flagged}
+
+
+def get_near_duplicate_index():
+    """Return the process-wide near-duplicate index (persisted if NIGHTINGALE_DEDUP_DB is set)."""
+    path = os.getenv("NIGHTINGALE_DEDUP_DB")
+    return get_registry().get("index", ("near_duplicates", path), lambda: NearDuplicateIndex(path))
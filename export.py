@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Columnar export of batch screening results.
+
+Writes one row per candidate with one column per skill score, plus a long
+side table of per-skill reasoning, as Parquet (or Arrow IPC) files. Rows are
+written in row groups as they are produced, so memory stays flat however
+large the requisition is.
+
+    python export.py --requisition req-1a2b3c4d5e6f --out screening.parquet
+"""
+
+import argparse
+import os
+import re
+
+import pandas as pd
+from storage import DEFAULT_DB_PATH, ResultsStore, normalize_skill
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+def skill_column(skill):
+    """Column name for a skill score, e.g. "Machine Learning" -> "score_machine_learning"."""
+    return "score_" + (re.sub(r"\W+", "_", normalize_skill(skill)).strip("_") or "skill")
+
+
+def skill_columns(skills):
+    """Map normalized skills to unique column names, in order."""
+    columns = {}
+    used = set()
+    for skill in skills:
+        key = normalize_skill(skill)
+        if key in columns:
+            continue
+        column = skill_column(skill)
+        suffix = 2
+        while column in used:
+            column = f"{skill_column(skill)}_{suffix}"
+            suffix += 1
+        used.add(column)
+        columns[key] = column
+    return columns
+
+
+def candidate_row(entry, columns):
+    """Flatten one candidate result into a row of the candidates table."""
+    result = entry["result"]
+    usage = result.get("usage") or {}
+    scores = {normalize_skill(skill): score for skill, score in result.get("skills_scores", {}).items()}
+    row = {
+        "candidate": entry["candidate"],
+        "overall_score": result.get("overall_score", 0),
+        "selected": bool(result.get("selected", False)),
+        "missing_skills": len(result.get("missing_skills", [])),
+        "total_tokens": usage.get("total_tokens", 0),
+        "cost": usage.get("cost", 0.0),
+    }
+    for key, column in columns.items():
+        row[column] = scores.get(key)
+    return row
+
+
+def reasoning_rows(entry):
+    """Long-format rows (candidate, skill, score, reasoning) for the side table."""
+    result = entry["result"]
+    scores = result.get("skills_scores", {})
+    return [
+        {"candidate": entry["candidate"], "skill": skill, "score": scores.get(skill), "reasoning": reasoning}
+        for skill, reasoning in result.get("skill_reasoning", {}).items()
+    ]
+
+
+def results_dataframe(entries, skills):
+    """Candidates table as a pandas DataFrame, for in-memory analysis of smaller batches."""
+    columns = skill_columns(skills)
+    return pd.DataFrame([candidate_row(entry, columns) for entry in entries if entry.get("result")])
+
+
+def reasoning_path_for(path):
+    stem, extension = os.path.splitext(path)
+    return f"{stem}_reasoning{extension}"
+
+
+def export_results(entries, path, skills, file_format="parquet", row_group_size=1000):
+    """Stream candidate results into a candidates file and a reasoning side file.
+
+    entries is any iterable of {"candidate", "result"} dicts (a batch's
+    "candidates" list or ResultsStore.iter_results). Returns the paths written
+    and the number of candidate rows, or None if pyarrow is not installed.
+    """
+    if not PYARROW_AVAILABLE:
+        print("Warning: pyarrow not installed. Install it with: pip install pyarrow")
+        return None
+
+    columns = skill_columns(skills)
+    candidates_schema = pa.schema(
+        [
+            ("candidate", pa.string()),
+            ("overall_score", pa.int32()),
+            ("selected", pa.bool_()),
+            ("missing_skills", pa.int32()),
+            ("total_tokens", pa.int64()),
+            ("cost", pa.float64()),
+        ]
+        + [(column, pa.int8()) for column in columns.values()],
+        metadata={"skills": ",".join(columns)}
+    )
+    reasoning_schema = pa.schema([
+        ("candidate", pa.string()),
+        ("skill", pa.string()),
+        ("score", pa.int8()),
+        ("reasoning", pa.string()),
+    ])
+    reasoning_path = reasoning_path_for(path)
+
+    def open_writer(target, schema):
+        if file_format == "arrow":
+            return pa.ipc.new_file(target, schema)
+        return pq.ParquetWriter(target, schema, compression="zstd")
+
+    candidate_writer = open_writer(path, candidates_schema)
+    reasoning_writer = open_writer(reasoning_path, reasoning_schema)
+    candidate_buffer = []
+    reasoning_buffer = []
+    total_rows = 0
+
+    def flush():
+        if candidate_buffer:
+            candidate_writer.write_table(pa.Table.from_pylist(candidate_buffer, schema=candidates_schema))
+            candidate_buffer.clear()
+        if reasoning_buffer:
+            reasoning_writer.write_table(pa.Table.from_pylist(reasoning_buffer, schema=reasoning_schema))
+            reasoning_buffer.clear()
+
+    try:
+        for entry in entries:
+            if not entry.get("result"):
+                continue
+            candidate_buffer.append(candidate_row(entry, columns))
+            reasoning_buffer.extend(reasoning_rows(entry))
+            total_rows += 1
+            if len(candidate_buffer) >= row_group_size:
+                flush()
+        flush()
+    finally:
+        candidate_writer.close()
+        reasoning_writer.close()
+
+    return {"candidates_path": path, "reasoning_path": reasoning_path, "rows": total_rows}
+
+
+def export_batch(batch, path, **kwargs):
+    """Export the output of ResumeAnalysisAgent.analyze_batch / resume_batch."""
+    return export_results(batch.get("candidates", []), path, batch.get("skills", []), **kwargs)
+
+
+def export_requisition(store, requisition, path, **kwargs):
+    """Export every stored analysis of a requisition from a ResultsStore."""
+    return export_results(store.iter_results(requisition), path, store.requisition_skills(requisition), **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export screening results to Parquet or Arrow")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Results store database")
+    parser.add_argument("--requisition", required=True)
+    parser.add_argument("--out", required=True, help="Candidates file; reasoning goes to <name>_reasoning")
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    parser.add_argument("--row-group-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    exported = export_requisition(
+        ResultsStore(args.db), args.requisition, args.out,
+        file_format=args.format, row_group_size=args.row_group_size
+    )
+    if exported:
+        print(f"✅ Exported {exported['rows']} candidates to {exported['candidates_path']}")
+        print(f"   Reasoning: {exported['reasoning_path']}")
+
+
+if __name__ == "__main__":
+    main()
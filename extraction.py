@@ -0,0 +1,422 @@
+import importlib
+import importlib.util
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import unicodedata
+import zipfile
+from html.parser import HTMLParser
+from xml.etree import ElementTree
+
+from llm import estimate_tokens
+
+try:
+    import resource
+    RESOURCE_LIMITS_AVAILABLE = True
+except ImportError:
+    RESOURCE_LIMITS_AVAILABLE = False
+
+
+class ExtractionError(Exception):
+    """Raised when a document can't be turned into text.
+
+    `code` is one of: unsupported_format, too_large, unreadable, timeout,
+    memory_limit, crashed, backend_error.
+    """
+
+    def __init__(self, code, message, filename=None, file_format=None, backend=None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.filename = filename
+        self.file_format = file_format
+        self.backend = backend
+
+    def __str__(self):
+        where = f"{self.filename}: " if self.filename else ""
+        return f"{where}{self.message} ({self.code})"
+
+    def to_dict(self):
+        return {
+            "code": self.code,
+            "message": self.message,
+            "filename": self.filename,
+            "format": self.file_format,
+            "backend": self.backend,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["code"], data["message"], data.get("filename"), data.get("format"), data.get("backend"))
+
+
+class ExtractionLimits:
+    """Per-document limits for extraction.
+
+    Formats in `isolate` are parsed in a separate process that is killed after
+    `timeout` seconds and capped at `max_memory_mb` of address space, so a
+    malformed file can't hang or exhaust the worker that submitted it.
+    """
+
+    def __init__(self, timeout=30, max_memory_mb=1024, max_bytes=20 * 1024 * 1024, isolate=("pdf", "docx")):
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+        self.max_bytes = max_bytes
+        self.isolate = set(isolate)
+
+
+def sniff_format(data, filename=None):
+    """Detect a document's format from its content, falling back to the file extension."""
+    head = data[:2048]
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                if "word/document.xml" in archive.namelist():
+                    return "docx"
+        except zipfile.BadZipFile:
+            pass
+        return None
+    if head.startswith(b"\xd0\xcf\x11\xe0"):
+        # Legacy binary Office formats (.doc) are not supported
+        return None
+    text = head.decode("utf-8", errors="ignore").lstrip("﻿ \t\r\n").lower()
+    if text.startswith(("<!doctype html", "<html")) or re.search(r"<(body|div|p|h[1-6])[\s>]", text):
+        return "html"
+    if b"\x00" not in head:
+        return "txt"
+    extension = filename.rsplit(".", 1)[-1].lower() if filename and "." in filename else None
+    return extension if extension in BACKENDS else None
+
+
+def decode_text(data):
+    """Decode plain text, tolerating a BOM and non-UTF-8 encodings."""
+    for encoding in ("utf-8-sig", "cp1252"):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return data.decode("latin-1")
+
+
+def extract_pdf_pymupdf(data):
+    import fitz
+    with fitz.open(stream=data, filetype="pdf") as document:
+        return "\f".join(page.get_text() for page in document)
+
+
+def extract_pdf_pypdf(data):
+    import pypdf
+    reader = pypdf.PdfReader(io.BytesIO(data))
+    return "\f".join(page.extract_text() or "" for page in reader.pages)
+
+
+def extract_pdf_pypdf2(data):
+    import PyPDF2
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return "\f".join(page.extract_text() or "" for page in reader.pages)
+
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def extract_docx(data):
+    """Read the text runs of word/document.xml directly, one line per paragraph."""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        xml = archive.read("word/document.xml")
+    paragraphs = []
+    current = []
+    for _, element in ElementTree.iterparse(io.BytesIO(xml), events=("end",)):
+        tag = element.tag
+        if tag == WORD_NAMESPACE + "t":
+            current.append(element.text or "")
+        elif tag == WORD_NAMESPACE + "tab":
+            current.append("\t")
+        elif tag in (WORD_NAMESPACE + "br", WORD_NAMESPACE + "cr"):
+            current.append("\n")
+        elif tag == WORD_NAMESPACE + "p":
+            paragraphs.append("".join(current))
+            current = []
+            element.clear()
+    return "\n".join(paragraphs)
+
+
+class _HTMLTextParser(HTMLParser):
+    BLOCK_TAGS = {"p", "div", "br", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "section", "article",
+                  "header", "footer", "ul", "ol", "table"}
+    SKIP_TAGS = {"script", "style", "head", "noscript"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self.skipping += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+        elif tag == "li":
+            self.parts.append("\n- ")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self.skipping = max(0, self.skipping - 1)
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.parts.append(data)
+
+
+def extract_html(data):
+    parser = _HTMLTextParser()
+    parser.feed(decode_text(data))
+    parser.close()
+    text = "".join(parser.parts)
+    return re.sub(r"\n\s*\n+", "\n\n", re.sub(r"[ \t]+", " ", text)).strip()
+
+
+def extract_txt(data):
+    return decode_text(data)
+
+
+# Backends per format, fastest first. PDF backends separate pages with form
+# feeds (\f) so normalize_text can find repeated headers and footers. A
+# backend is used if its module is installed.
+BACKENDS = {}
+
+
+def register_backend(file_format, name, extract, requires=None, priority=100):
+    """Add an extraction backend; lower priority numbers are tried first.
+
+    `extract` takes the document bytes and returns its text. It must be a
+    module-level function of an importable module so it can run in an
+    isolated child process.
+    """
+    backends = BACKENDS.setdefault(file_format, [])
+    backends[:] = [backend for backend in backends if backend["name"] != name]
+    backends.append({"name": name, "extract": extract, "requires": requires, "priority": priority})
+    backends.sort(key=lambda backend: backend["priority"])
+
+
+register_backend("pdf", "pymupdf", extract_pdf_pymupdf, requires="fitz", priority=10)
+register_backend("pdf", "pypdf", extract_pdf_pypdf, requires="pypdf", priority=20)
+register_backend("pdf", "PyPDF2", extract_pdf_pypdf2, requires="PyPDF2", priority=30)
+register_backend("docx", "docx-xml", extract_docx, priority=10)
+register_backend("html", "html-parser", extract_html, priority=10)
+register_backend("txt", "text", extract_txt, priority=10)
+
+
+def select_backend(file_format):
+    """Return the fastest installed backend for a format, or None."""
+    for backend in BACKENDS.get(file_format, []):
+        if backend["requires"] is None or importlib.util.find_spec(backend["requires"]) is not None:
+            return backend
+    return None
+
+
+def _run_isolated(target, max_memory_mb):
+    """Child process entry point: read the document from stdin, write a JSON outcome to stdout."""
+    try:
+        if RESOURCE_LIMITS_AVAILABLE and max_memory_mb:
+            limit = max_memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        module_name, function_name = target.split(":")
+        extract = getattr(importlib.import_module(module_name), function_name)
+        outcome = {"status": "ok", "text": extract(sys.stdin.buffer.read())}
+    except MemoryError:
+        outcome = {"status": "memory_limit", "text": "Document needs more memory than allowed"}
+    except Exception as e:
+        outcome = {"status": "backend_error", "text": f"{type(e).__name__}: {e}"}
+    sys.stdout.buffer.write(json.dumps(outcome).encode("utf-8"))
+
+
+def _extract_isolated(backend, data, limits):
+    """Run a backend in a fresh interpreter that is killed if it exceeds the time limit."""
+    extract = backend["extract"]
+    target = f"{extract.__module__}:{extract.__qualname__}"
+    try:
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), target, str(limits.max_memory_mb or 0)],
+            input=data, capture_output=True, timeout=limits.timeout,
+            # Same import path as this process, so registered backends resolve in the child
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(path for path in sys.path if path)}
+        )
+    except subprocess.TimeoutExpired:
+        raise ExtractionError("timeout", f"Extraction took longer than {limits.timeout}s")
+    try:
+        outcome = json.loads(completed.stdout.decode("utf-8"))
+    except ValueError:
+        raise ExtractionError("crashed", f"Extraction process exited unexpectedly (code {completed.returncode})")
+    if outcome["status"] != "ok":
+        raise ExtractionError(outcome["status"], outcome["text"])
+    return outcome["text"]
+
+
+def extract_document(data, filename=None, limits=None):
+    """Extract text from document bytes, detecting the format from the content.
+
+    Raises ExtractionError describing what went wrong instead of hanging or
+    returning partial garbage.
+    """
+    limits = limits or ExtractionLimits()
+    if limits.max_bytes and len(data) > limits.max_bytes:
+        raise ExtractionError(
+            "too_large", f"Document is {len(data) / 2**20:.1f} MB, the limit is {limits.max_bytes / 2**20:.1f} MB",
+            filename
+        )
+    file_format = sniff_format(data, filename)
+    if file_format is None:
+        raise ExtractionError("unsupported_format", "Unsupported format. Upload a PDF, DOCX, HTML or TXT file.", filename)
+    backend = select_backend(file_format)
+    if backend is None:
+        raise ExtractionError(
+            "unsupported_format", f"No {file_format.upper()} extraction backend is installed", filename, file_format
+        )
+    try:
+        if file_format in limits.isolate:
+            return _extract_isolated(backend, data, limits)
+        return backend["extract"](data)
+    except ExtractionError as e:
+        e.filename, e.file_format, e.backend = filename, file_format, backend["name"]
+        raise
+    except Exception as e:
+        raise ExtractionError("backend_error", f"{type(e).__name__}: {e}", filename, file_format, backend["name"])
+
+
+# "Page 2", "Page 2 of 3", "2 of 3", "2/3": decorated, so unmistakably a page number
+PAGE_NUMBER_PATTERN = re.compile(
+    r"^[-–—\s]*(?:page\s*(\d{1,3})(?:\s*(?:of|/)\s*(\d{1,3}))?|(\d{1,3})\s*(?:of|/)\s*(\d{1,3}))[-–—\s]*$"
+)
+# A bare number is only a page number when it runs in sequence across pages; "2019" alone is a date
+BARE_NUMBER_PATTERN = re.compile(r"^[-–—\s]*(\d{1,3})[-–—\s]*$")
+PAGE_REFERENCE_PATTERN = re.compile(r"\b(page\s*\d+(\s*(of|/)\s*\d+)?|\d+\s*(of|/)\s*\d+)\b")
+# Lines at the top and bottom of each page checked for running headers and footers
+PAGE_EDGE_LINES = 3
+# A word broken at a line break after one of these parts is a real compound
+# ("well-known", "event-driven"), so its hyphen is kept when rejoining
+COMPOUND_PREFIXES = frozenset({
+    "well", "self", "cross", "full", "part", "non", "end", "real", "high", "low", "long", "short", "state",
+    "hands", "fast", "open", "cutting", "front", "back", "client", "server", "data", "test", "event", "object",
+    "detail", "results", "customer", "user", "team", "cost", "mission", "cloud", "best", "world", "large",
+    "small", "mid", "senior", "entry", "fine",
+})
+COMPOUND_SUFFIXES = frozenset({
+    "based", "driven", "oriented", "facing", "level", "scale", "known", "end", "stack", "ended", "making",
+    "solving", "focused", "minded", "term", "source", "class", "quality", "related", "specific", "wide",
+})
+HYPHENATED_BREAK_PATTERN = re.compile(r"([\w-]*[a-z])-[ \t]*\n[ \t]*([a-z]\w*)")
+
+
+def _line_key(line):
+    # Footers like "Jane Doe - Page 2 of 3" change from page to page, so mask the page number
+    return PAGE_REFERENCE_PATTERN.sub("page #", " ".join(line.split()).lower())
+
+
+def _is_decorated_page_number(line):
+    match = PAGE_NUMBER_PATTERN.match(line)
+    if not match:
+        return False
+    number, total = (match.group(1), match.group(2)) if match.group(1) else (match.group(3), match.group(4))
+    return total is None or int(number) <= int(total)
+
+
+def _running_page_numbers(pages, edges):
+    """(page index, line index) of bare numbers that count pages.
+
+    A bare number counts pages when it equals its page index plus the same
+    offset as on at least one other page.
+    """
+    candidates = {}
+    for page, (lines, edge) in enumerate(zip(pages, edges)):
+        for index in edge:
+            match = BARE_NUMBER_PATTERN.match(lines[index])
+            if match:
+                candidates.setdefault(int(match.group(1)) - page, set()).add((page, index))
+    running = set()
+    for positions in candidates.values():
+        # The sequence has to hold on at least two pages
+        if len({page for page, _ in positions}) >= 2:
+            running |= positions
+    return running
+
+
+def _join_hyphenated(match):
+    """Rejoin a word hyphenated across a line break, keeping the hyphen of real compounds."""
+    first, second = match.group(1), match.group(2)
+    if "-" in first or first.lower() in COMPOUND_PREFIXES or second.lower() in COMPOUND_SUFFIXES:
+        return f"{first}-{second}"
+    return first + second
+
+
+def normalize_text(text):
+    """Strip layout noise from extracted text before it goes into prompts.
+
+    On multi-page text, removes page numbers (decorated ones like "Page 2 of
+    3", and bare numbers only when they run in sequence across pages) and
+    headers/footers repeated across pages (keeping the first occurrence of
+    those without a page number). Single-page text keeps all its lines.
+    Rejoins words hyphenated across line breaks (keeping the hyphen of
+    compounds like "well-known") and collapses whitespace. Returns the
+    normalized text and a report of what was removed and how many
+    characters and estimated tokens it saved.
+    """
+    original = text
+    text = unicodedata.normalize("NFKC", text).replace("\u00ad", "")
+    pages = [page.splitlines() for page in text.split("\f")]
+
+    edges = []
+    for lines in pages:
+        filled = [index for index, line in enumerate(lines) if line.strip()]
+        # Without page breaks there are no running headers, footers or page numbers to find
+        edges.append(set(filled[:PAGE_EDGE_LINES] + filled[-PAGE_EDGE_LINES:]) if len(pages) > 1 else set())
+    page_numbers = _running_page_numbers(pages, edges)
+    page_counts = {}
+    for lines, edge in zip(pages, edges):
+        for key in {_line_key(lines[index]) for index in edge}:
+            page_counts[key] = page_counts.get(key, 0) + 1
+    # A running header or footer shows up on at least half of the pages
+    threshold = max(2, (len(pages) + 1) // 2)
+
+    kept = []
+    seen = set()
+    removed = 0
+    for page, (lines, edge) in enumerate(zip(pages, edges)):
+        for index, line in enumerate(lines):
+            if index in edge:
+                key = _line_key(line)
+                if (page, index) in page_numbers or _is_decorated_page_number(line.strip().lower()) \
+                        or (page_counts[key] >= threshold and (key in seen or "page #" in key)):
+                    removed += 1
+                    continue
+                seen.add(key)
+            kept.append(line)
+    text = "\n".join(kept)
+
+    text, hyphenations = HYPHENATED_BREAK_PATTERN.subn(_join_hyphenated, text)
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r" ?\n ?", "\n", text)
+    text = re.sub(r"\n{3,}", "\n\n", text).strip()
+
+    original_tokens = estimate_tokens(original)
+    tokens = estimate_tokens(text)
+    return text, {
+        "original_chars": len(original),
+        "chars": len(text),
+        "chars_saved": len(original) - len(text),
+        "original_tokens": original_tokens,
+        "tokens": tokens,
+        "tokens_saved": original_tokens - tokens,
+        "repeated_lines_removed": removed,
+        "hyphenations_joined": hyphenations,
+    }
+
+
+if __name__ == "__main__":
+    _run_isolated(sys.argv[1], int(sys.argv[2]))
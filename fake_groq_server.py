@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the Groq chat completions API, for local load testing.
+
+Answers POST /openai/v1/chat/completions with canned responses shaped for
+each prompt the agent sends, with configurable latency and rate limiting.
+Point the agent at it with:
+    GROQ_BASE_URL=http://127.0.0.1:9000 python service.py
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def canned_reply(prompt):
+    """Return a plausible reply for the kind of prompt the agent sent."""
+    if "API test successful" in prompt:
+        return "API test successful"
+    if "Python list of strings" in prompt:
+        return json.dumps(["Python", "SQL", "Docker", "AWS", "Machine Learning"])
+    if "Score: X - Explanation" in prompt:
+        return f"Score: {random.randint(2, 10)} - The resume shows related experience and projects."
+    if '"weakness"' in prompt:
+        return json.dumps({
+            "weakness": "The resume does not show hands-on use of this skill.",
+            "improvement_suggestions": ["Add a project using it", "Quantify the impact", "List related tools"],
+            "example_addition": "Built a service using this skill that cut processing time by 30%."
+        })
+    if '"question"' in prompt:
+        return json.dumps([
+            {"type": "technical", "question": "Walk me through a recent project.", "focus_area": "Python"}
+        ])
+    if '"content"' in prompt:
+        return json.dumps({
+            "content": "Improved resume content",
+            "improvements": ["Stronger action verbs"],
+            "ats_analysis": {"score": 85, "improvement": 10, "keywords_matched": 10, "keywords_added": 3,
+                             "readability": 8, "recommendations": ["Add metrics"]}
+        })
+    return "The candidate has relevant experience described in the resume."
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible chat completions endpoint."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        prompt = " ".join(m.get("content", "") for m in request.get("messages", []))
+
+        server = self.server
+        if random.random() < server.rate_limit_rate:
+            body = json.dumps({"error": {"message": "Rate limit reached", "type": "rate_limit"}}).encode()
+            self.send_response(429)
+            self.send_header("Retry-After", str(server.retry_after))
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        time.sleep(random.lognormvariate(0, server.latency_sigma) * server.latency)
+        content = canned_reply(prompt)
+        prompt_tokens = len(re.findall(r"\S+", prompt))
+        completion_tokens = len(re.findall(r"\S+", content))
+        body = json.dumps({
+            "id": "fake-completion",
+            "object": "chat.completion",
+            "model": request.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in Groq API server for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.3, help="Median response latency in seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Spread of the log-normal latency")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of calls answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), FakeGroqHandler)
+    server.daemon_threads = True
+    server.latency = args.latency
+    server.latency_sigma = args.latency_sigma
+    server.rate_limit_rate = args.rate_limit_rate
+    server.retry_after = args.retry_after
+    print(f"🧪 Fake Groq API listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Fake Groq API stopped.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
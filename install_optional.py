@@ -29,7 +29,9 @@ def main():
         "langchain-groq>=0.1.0",
         "faiss-cpu>=1.8.0",
         "openai>=1.10.0",
-        "groq>=0.4.0"
+        "groq>=0.4.0",
+        "pyarrow>=14.0.0",
+        "pymupdf>=1.23.0"
     ]
     
     print("Installing optional packages for enhanced functionality...")
@@ -37,6 +39,8 @@ def main():
     print("• Vector embeddings for better semantic analysis")
     print("• Advanced RAG (Retrieval Augmented Generation)")
     print("• Enhanced question-answering capabilities")
+    print("• Parquet/Arrow export of screening results")
+    print("• Faster PDF text extraction")
     print()
     
     success_count = 0
@@ -0,0 +1,670 @@
+import functools
+import importlib.util
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from resources import get_registry
+
+
+# Approximate Groq list prices in USD per 1M tokens (input, output).
+MODEL_PRICING = {
+    "qwen/qwen3-32b": (0.29, 0.59),
+    "llama-3.1-70b-versatile": (0.59, 0.79),
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+}
+DEFAULT_PRICING = (0.59, 0.79)
+# Completion tokens held against a budget for a call whose response isn't back yet
+COMPLETION_TOKEN_ESTIMATE = 300
+
+
+class BudgetExceeded(Exception):
+    """Raised when an analysis goes over its token or cost budget."""
+
+
+def estimate_tokens(text):
+    """Rough token count of a text (about 4 characters per token for English)."""
+    return (len(text) + 3) // 4
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    """Estimate the USD cost of a call from its token counts."""
+    input_price, output_price = MODEL_PRICING.get(model, DEFAULT_PRICING)
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def extract_usage(response):
+    """Pull prompt and completion token counts out of an LLM response.
+
+    Handles the `usage` dict set by SimpleGroqClient as well as the
+    `usage_metadata` / `response_metadata` fields of langchain messages.
+    """
+    usage = getattr(response, "usage", None)
+    if usage:
+        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+    usage_metadata = getattr(response, "usage_metadata", None)
+    if usage_metadata:
+        return usage_metadata.get("input_tokens", 0), usage_metadata.get("output_tokens", 0)
+
+    response_metadata = getattr(response, "response_metadata", None) or {}
+    token_usage = response_metadata.get("token_usage") or {}
+    return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+
+
+def empty_usage_summary():
+    """Return a zeroed usage summary."""
+    return {
+        "calls": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+        "cost": 0.0,
+        "by_call_type": {},
+    }
+
+
+def merge_usage_summaries(summaries):
+    """Roll several usage summaries up into one (e.g. per batch)."""
+    merged = empty_usage_summary()
+    for summary in summaries:
+        if not summary:
+            continue
+        for field in ("calls", "prompt_tokens", "completion_tokens", "total_tokens", "cost"):
+            merged[field] += summary.get(field, 0)
+        for call_type, stats in summary.get("by_call_type", {}).items():
+            bucket = merged["by_call_type"].setdefault(
+                call_type, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0}
+            )
+            for field in bucket:
+                bucket[field] += stats.get(field, 0)
+    merged["cost"] = round(merged["cost"], 6)
+    return merged
+
+
+class UsageTracker:
+    """Thread-safe token and cost accounting for the calls of one analysis.
+
+    With a budget, each call reserves its estimated usage before it starts
+    (see reserve), so concurrent calls can't overshoot the budget together.
+    """
+
+    def __init__(self, max_tokens=None, max_cost=None):
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.records = []
+        # Estimated usage of calls in flight, counted against the budget until they finish
+        self.reserved_tokens = 0
+        self.reserved_cost = 0.0
+        self._used_tokens = 0
+        self._used_cost = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, call_type, model, prompt_tokens, completion_tokens, latency=None):
+        """Record the token usage of one finished call."""
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            self._used_tokens += prompt_tokens + completion_tokens
+            self._used_cost += cost
+            self.records.append({
+                "call_type": call_type,
+                "model": model,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "cost": cost,
+                "latency": latency,
+                "timestamp": time.time(),
+            })
+
+    def record_response(self, call_type, model, response, latency=None):
+        """Record the usage reported by an LLM response."""
+        prompt_tokens, completion_tokens = extract_usage(response)
+        self.record(call_type, model, prompt_tokens, completion_tokens, latency)
+
+    def reserve(self, model, prompt_tokens, completion_tokens=COMPLETION_TOKEN_ESTIMATE):
+        """Hold the estimated usage of a call against the budget until release().
+
+        Raises BudgetExceeded instead if the call could take the analysis over
+        its budget, counting the calls already in flight. Returns the
+        reservation to pass to release() once the call has finished.
+        """
+        tokens = prompt_tokens + completion_tokens
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            if self.max_tokens is not None and self._used_tokens + self.reserved_tokens + tokens > self.max_tokens:
+                raise BudgetExceeded(
+                    f"Token budget exceeded: {self._used_tokens} used and {self.reserved_tokens} in flight of "
+                    f"{self.max_tokens} tokens, the next call needs about {tokens}"
+                )
+            if self.max_cost is not None and self._used_cost + self.reserved_cost + cost > self.max_cost:
+                raise BudgetExceeded(
+                    f"Cost budget exceeded: ${self._used_cost:.4f} used and ${self.reserved_cost:.4f} in flight of "
+                    f"${self.max_cost:.4f}, the next call needs about ${cost:.4f}"
+                )
+            self.reserved_tokens += tokens
+            self.reserved_cost += cost
+        return tokens, cost
+
+    def release(self, reservation):
+        """Return a reservation once its call has finished and its usage is recorded."""
+        tokens, cost = reservation
+        with self._lock:
+            self.reserved_tokens -= tokens
+            self.reserved_cost -= cost
+
+    def check_budget(self):
+        """Raise BudgetExceeded if the token or cost budget has been used up.
+
+        Called before each new LLM call so an analysis stops as soon as it
+        runs out of budget, without discarding the call that crossed it, and
+        after a fan-out of concurrent calls in case they used more than they
+        reserved.
+        """
+        summary = self.summary()
+        if self.max_tokens is not None and summary["total_tokens"] >= self.max_tokens:
+            raise BudgetExceeded(
+                f"Token budget exceeded: {summary['total_tokens']} of {self.max_tokens} tokens used"
+            )
+        if self.max_cost is not None and summary["cost"] >= self.max_cost:
+            raise BudgetExceeded(
+                f"Cost budget exceeded: ${summary['cost']:.4f} of ${self.max_cost:.4f} used"
+            )
+
+    def summary(self):
+        """Return totals for the recorded calls, broken down by call type."""
+        summary = empty_usage_summary()
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            summary["calls"] += 1
+            summary["prompt_tokens"] += record["prompt_tokens"]
+            summary["completion_tokens"] += record["completion_tokens"]
+            summary["cost"] += record["cost"]
+            bucket = summary["by_call_type"].setdefault(
+                record["call_type"], {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0}
+            )
+            bucket["calls"] += 1
+            bucket["prompt_tokens"] += record["prompt_tokens"]
+            bucket["completion_tokens"] += record["completion_tokens"]
+            bucket["cost"] += record["cost"]
+        summary["total_tokens"] = summary["prompt_tokens"] + summary["completion_tokens"]
+        summary["cost"] = round(summary["cost"], 6)
+        return summary
+
+
+# langchain_core is only imported once a chain needs a callback
+LANGCHAIN_CALLBACKS_AVAILABLE = importlib.util.find_spec("langchain_core") is not None
+
+
+@functools.lru_cache(maxsize=None)
+def _usage_callback_class():
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class UsageCallbackHandler(BaseCallbackHandler):
+        """Langchain callback that records usage of calls made inside chains."""
+
+        def __init__(self, tracker, call_type, model):
+            super().__init__()
+            self.tracker = tracker
+            self.call_type = call_type
+            self.model = model
+
+        def on_llm_end(self, response, **kwargs):
+            token_usage = (response.llm_output or {}).get("token_usage") or {}
+            self.tracker.record(
+                self.call_type,
+                self.model,
+                token_usage.get("prompt_tokens", 0),
+                token_usage.get("completion_tokens", 0),
+            )
+
+    return UsageCallbackHandler
+
+
+def usage_callback_handler(tracker, call_type, model):
+    """Langchain callback recording the usage of calls made inside a chain on a tracker."""
+    return _usage_callback_class()(tracker, call_type, model)
+
+
+class RateLimitError(Exception):
+    """Raised when the provider rejects a call with HTTP 429."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LLMTimeoutError(Exception):
+    """Raised when an LLM call times out."""
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header value in seconds; HTTP dates are ignored."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(error):
+    """Classify an LLM error and return (kind, retry_after).
+
+    kind is one of "rate_limit", "timeout", "server_error", "network" or
+    "error"; everything except "error" is worth retrying.
+    """
+    if isinstance(error, RateLimitError):
+        return "rate_limit", error.retry_after
+    if isinstance(error, LLMTimeoutError):
+        return "timeout", None
+
+    # Errors raised by the groq / openai SDKs used under langchain
+    status_code = getattr(error, "status_code", None)
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    name = type(error).__name__.lower()
+    if status_code == 429 or "ratelimit" in name or "429" in str(error):
+        return "rate_limit", parse_retry_after(headers.get("retry-after"))
+    if "timeout" in name or "timed out" in str(error).lower():
+        return "timeout", None
+    if (status_code or 0) >= 500 or re.search(r"status 5\d\d", str(error)):
+        return "server_error", None
+    if "connection" in name or "network error" in str(error).lower():
+        return "network", None
+    return "error", None
+
+
+RETRYABLE_ERRORS = ("rate_limit", "timeout", "server_error", "network")
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter for LLM calls.
+
+    The limit grows by roughly one slot per round of successful calls and is
+    cut multiplicatively on rate limits, timeouts or a latency spike. Latency
+    is compared per key (model and call type), since an 8B classification
+    and a 70B rewrite share the limiter but not their normal latency; a key
+    needs a few samples before it can cut the limit. A Retry-After from the
+    provider pauses new calls until it has elapsed.
+    """
+
+    def __init__(self, initial_limit=4, min_limit=1, max_limit=32, backoff_factor=0.5,
+                 latency_tolerance=2.0, decrease_cooldown=1.0, min_latency_samples=5):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_factor = backoff_factor
+        self.latency_tolerance = latency_tolerance
+        self.decrease_cooldown = decrease_cooldown
+        self.min_latency_samples = min_latency_samples
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        # key -> [baseline latency, recent latency, samples]
+        self.latencies = {}
+        self.last_decrease = 0.0
+        self.stats = {"successes": 0, "rate_limits": 0, "timeouts": 0, "errors": 0, "decreases": 0}
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Block until a slot is free and no Retry-After pause is active."""
+        with self._condition:
+            while True:
+                wait = self.blocked_until - time.time()
+                if wait <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                self._condition.wait(timeout=wait if wait > 0 else None)
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self, latency, key=None):
+        """Additive increase, unless latency has risen well above the baseline of its key."""
+        with self._condition:
+            self.stats["successes"] += 1
+            entry = self.latencies.get(key)
+            if entry is None:
+                entry = self.latencies[key] = [latency, latency, 1]
+            else:
+                entry[0] = 0.95 * entry[0] + 0.05 * latency
+                entry[1] = 0.7 * entry[1] + 0.3 * latency
+                entry[2] += 1
+            baseline, recent, samples = entry
+            if samples >= self.min_latency_samples and recent > baseline * self.latency_tolerance:
+                self._decrease()
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._condition.notify_all()
+
+    def on_error(self, error):
+        """Multiplicative decrease on rate limits and timeouts."""
+        kind, retry_after = classify_error(error)
+        with self._condition:
+            if kind == "rate_limit":
+                self.stats["rate_limits"] += 1
+                if retry_after:
+                    self.blocked_until = max(self.blocked_until, time.time() + retry_after)
+                self._decrease()
+            elif kind == "timeout":
+                self.stats["timeouts"] += 1
+                self._decrease()
+            else:
+                self.stats["errors"] += 1
+            self._condition.notify_all()
+        return kind, retry_after
+
+    def _decrease(self):
+        # At most one decrease per cooldown window, so a burst of failures
+        # from calls that were already in flight only counts once.
+        now = time.time()
+        if now - self.last_decrease < self.decrease_cooldown:
+            return
+        self.last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.backoff_factor)
+        self.stats["decreases"] += 1
+
+    def call(self, fn, *args, latency_key=None, **kwargs):
+        """Run fn inside a slot and feed the outcome back into the limiter.
+
+        `latency_key` groups calls with comparable latency, e.g. (model, call type).
+        """
+        self.acquire()
+        start = time.time()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.on_error(e)
+            raise
+        finally:
+            self.release()
+        self.on_success(time.time() - start, latency_key)
+        return result
+
+    def snapshot(self):
+        """Return the current limit, in-flight count and counters."""
+        with self._condition:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "paused_for": max(0.0, round(self.blocked_until - time.time(), 2)),
+                **self.stats,
+            }
+
+
+def get_shared_limiter(key="groq"):
+    """Return the process-wide limiter for a provider account, creating it if needed."""
+    return get_registry().get("limiter", key, AdaptiveLimiter)
+
+
+class ResilientCaller:
+    """Call layer with jittered exponential backoff and optional hedged requests.
+
+    Every attempt goes through the limiter. With hedging enabled, a duplicate
+    request is sent once the first has been running longer than the recent
+    p95 latency; the first response wins. A hedge that has not started yet is
+    cancelled, one already in flight is abandoned and its response, if any,
+    is handed to on_discarded so its tokens can still be accounted for.
+    """
+
+    def __init__(self, limiter=None, max_attempts=3, base_delay=0.5, max_delay=8.0,
+                 hedge=False, hedge_percentile=0.95, hedge_min_delay=1.0, min_samples=20):
+        self.limiter = limiter
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.min_samples = min_samples
+        self.latencies = deque(maxlen=200)
+        self.stats = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "failures": 0}
+        self._lock = threading.Lock()
+        self._hedge_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge") if hedge else None
+
+    def call(self, fn, *args, on_discarded=None, latency_key=None, **kwargs):
+        """Call fn, retrying retryable errors with backoff; `latency_key` is passed to the limiter."""
+        with self._lock:
+            self.stats["calls"] += 1
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return self._attempt(fn, args, kwargs, on_discarded, latency_key)
+            except Exception as e:
+                kind, retry_after = classify_error(e)
+                if kind not in RETRYABLE_ERRORS or attempt == self.max_attempts:
+                    with self._lock:
+                        self.stats["failures"] += 1
+                    raise
+                delay = self.backoff_delay(attempt, retry_after)
+                print(f"LLM call failed ({kind}), retrying in {delay:.1f}s (attempt {attempt}/{self.max_attempts})")
+                with self._lock:
+                    self.stats["retries"] += 1
+                time.sleep(delay)
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """Full-jitter exponential backoff, never shorter than Retry-After."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+        return max(delay, retry_after or 0)
+
+    def hedge_delay(self):
+        """Delay before sending a hedge, or None until enough latencies are known."""
+        with self._lock:
+            if len(self.latencies) < self.min_samples:
+                return None
+            ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile))
+        return max(self.hedge_min_delay, ordered[index])
+
+    def _timed(self, fn, args, kwargs, latency_key=None):
+        start = time.time()
+        if self.limiter:
+            result = self.limiter.call(fn, *args, latency_key=latency_key, **kwargs)
+        else:
+            result = fn(*args, **kwargs)
+        with self._lock:
+            self.latencies.append(time.time() - start)
+        return result
+
+    def _attempt(self, fn, args, kwargs, on_discarded, latency_key=None):
+        delay = self.hedge_delay() if self.hedge else None
+        if delay is None:
+            return self._timed(fn, args, kwargs, latency_key)
+
+        primary = self._hedge_pool.submit(self._timed, fn, args, kwargs, latency_key)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        with self._lock:
+            self.stats["hedges"] += 1
+        hedge = self._hedge_pool.submit(self._timed, fn, args, kwargs, latency_key)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                for other in (done | pending) - {future}:
+                    if not other.cancel() and on_discarded:
+                        other.add_done_callback(
+                            lambda f: f.exception() is None and on_discarded(f.result())
+                        )
+                if future is hedge:
+                    with self._lock:
+                        self.stats["hedge_wins"] += 1
+                return future.result()
+        raise error
+
+    def snapshot(self):
+        """Return call counters and the current hedge delay."""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["hedge_delay"] = self.hedge_delay() if self.hedge else None
+        return stats
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapses concurrent identical calls into one.
+
+    The first caller for a key runs the call; callers arriving with the same
+    key while it is in flight wait for it and share its result or error.
+    Nothing is kept once the call returns, so this complements result
+    caches by covering the burst before anything is cached.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "executed": 0, "collapsed": 0}
+
+    def do(self, key, fn):
+        """Return fn()'s result, sharing one execution among concurrent callers with the same key."""
+        with self._lock:
+            self.stats["calls"] += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.stats["executed"] += 1
+            else:
+                self.stats["collapsed"] += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def snapshot(self):
+        """Return call counters and the number of calls in flight."""
+        with self._lock:
+            return {**self.stats, "in_flight": len(self._flights)}
+
+
+def get_shared_single_flight(key="groq"):
+    """Return the process-wide single-flight group for a provider account, creating it if needed."""
+    return get_registry().get("single_flight", key, SingleFlight)
+
+
+SMALL_MODEL = "llama-3.1-8b-instant"
+DEFAULT_MODEL = "qwen/qwen3-32b"
+LARGE_MODEL = "llama-3.3-70b-versatile"
+
+# Models tried in order for each call type; later entries are fallbacks.
+MODEL_ROUTES = {
+    "_test_api_connection": [SMALL_MODEL, DEFAULT_MODEL],
+    "analyze_skill": [SMALL_MODEL, DEFAULT_MODEL],
+    "direct_skill_analysis": [SMALL_MODEL, DEFAULT_MODEL],
+    "extract_skills_from_jd": [SMALL_MODEL, DEFAULT_MODEL],
+    "generate_improved_resume": [LARGE_MODEL, DEFAULT_MODEL],
+    "default": [DEFAULT_MODEL, LARGE_MODEL],
+}
+
+
+class ModelHealth:
+    """Failure counts and cooldowns of the models on one provider account.
+
+    A model is marked degraded after `failure_threshold` consecutive
+    retryable failures and is avoided until `cooldown` seconds have passed.
+    """
+
+    def __init__(self, failure_threshold=3, cooldown=60.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = {}
+        self.degraded_until = {}
+        self._lock = threading.Lock()
+
+    def is_healthy(self, model, now=None):
+        with self._lock:
+            return self.degraded_until.get(model, 0) <= (now or time.time())
+
+    def record_success(self, model):
+        with self._lock:
+            self.failures[model] = 0
+            self.degraded_until.pop(model, None)
+
+    def record_failure(self, model, error):
+        kind, _ = classify_error(error)
+        if kind not in RETRYABLE_ERRORS:
+            return
+        with self._lock:
+            self.failures[model] = self.failures.get(model, 0) + 1
+            if self.failures[model] >= self.failure_threshold:
+                print(f"Model {model} looks degraded, routing around it for {self.cooldown:.0f}s")
+                self.degraded_until[model] = time.time() + self.cooldown
+                self.failures[model] = 0
+
+    def snapshot(self):
+        """Return the degraded models and the seconds left on each."""
+        now = time.time()
+        with self._lock:
+            return {m: round(t - now, 1) for m, t in self.degraded_until.items() if t > now}
+
+
+class ModelRouter:
+    """Route each call type to a model, skipping models that look degraded.
+
+    Routes belong to the router; model health can be shared by routers
+    with different routes on the same account (see get_shared_router).
+    """
+
+    def __init__(self, routes=None, health=None):
+        self.routes = dict(MODEL_ROUTES)
+        self.routes.update(routes or {})
+        self.health = health or ModelHealth()
+
+    def candidates(self, call_type):
+        """Models to try for a call type: healthy ones first, degraded ones as a last resort."""
+        models = self.routes.get(call_type) or self.routes["default"]
+        now = time.time()
+        healthy = [m for m in models if self.health.is_healthy(m, now)]
+        return healthy + [m for m in models if m not in healthy]
+
+    def route(self, call_type):
+        """Return the preferred model for a call type."""
+        return self.candidates(call_type)[0]
+
+    def record_success(self, model):
+        self.health.record_success(model)
+
+    def record_failure(self, model, error):
+        self.health.record_failure(model, error)
+
+    def snapshot(self):
+        """Return the degraded models and the seconds left on each."""
+        return self.health.snapshot()
+
+
+def get_shared_router(key="groq", routes=None):
+    """Return the process-wide router for a provider account and routes, creating it if needed.
+
+    Routers on the same account share model health whatever their routes,
+    so a model degraded for one agent is routed around by all of them.
+    """
+    registry = get_registry()
+    health = registry.get("model_health", key, ModelHealth)
+    routes_key = tuple(sorted((call_type, tuple(models)) for call_type, models in (routes or {}).items()))
+    return registry.get("router", (key, routes_key), lambda: ModelRouter(routes, health))
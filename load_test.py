@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Load test for the headless analysis service.
+
+Submits many analysis jobs concurrently, polls them to completion and reports
+throughput, latency percentiles and how many submissions were rejected.
+
+    python fake_groq_server.py --port 9000 &
+    GROQ_API_KEY=test GROQ_BASE_URL=http://127.0.0.1:9000 python service.py --port 8000 &
+    python load_test.py --url http://127.0.0.1:8000 --jobs 200 --concurrency 20
+"""
+
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+SAMPLE_RESUME = """Jane Doe - Senior Software Engineer
+Experience: 6 years building Python services on AWS with Docker and PostgreSQL.
+Led a team of 4 engineers delivering machine learning pipelines for fraud detection.
+Education: BSc Computer Science.
+Skills: Python, SQL, Docker, Kubernetes, AWS, scikit-learn.
+"""
+
+
+def request_json(url, payload=None):
+    """Send a GET (or POST with a JSON payload) and return (status, body)."""
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+
+
+def run_job(base_url, skills, poll_interval):
+    """Submit one analysis and poll it; returns (outcome, seconds)."""
+    start = time.time()
+    status, body = request_json(f"{base_url}/analyze", {"resume_text": SAMPLE_RESUME, "skills": skills})
+    if status == 503:
+        return "rejected", time.time() - start
+    if status != 202:
+        return "error", time.time() - start
+    job_url = f"{base_url}/jobs/{body['job_id']}"
+    while True:
+        time.sleep(poll_interval)
+        status, job = request_json(job_url)
+        if job.get("status") in ("completed", "failed"):
+            return job["status"], time.time() - start
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Nightingale analysis service")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--skills", default="Python,SQL,Docker,AWS,Kubernetes")
+    parser.add_argument("--poll-interval", type=float, default=0.2)
+    args = parser.parse_args()
+
+    skills = [skill.strip() for skill in args.skills.split(",") if skill.strip()]
+    print(f"🚀 Running {args.jobs} jobs with concurrency {args.concurrency} against {args.url}")
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        outcomes = list(executor.map(lambda _: run_job(args.url, skills, args.poll_interval), range(args.jobs)))
+    elapsed = time.time() - start
+
+    counts = {}
+    for outcome, _ in outcomes:
+        counts[outcome] = counts.get(outcome, 0) + 1
+    latencies = [seconds for outcome, seconds in outcomes if outcome == "completed"]
+
+    print("=" * 50)
+    print(f"Outcomes:   {counts}")
+    print(f"Throughput: {counts.get('completed', 0) / elapsed:.2f} jobs/s over {elapsed:.1f}s")
+    print(f"Latency:    p50 {percentile(latencies, 0.5):.2f}s  p95 {percentile(latencies, 0.95):.2f}s  "
+          f"p99 {percentile(latencies, 0.99):.2f}s")
+    status, health = request_json(f"{args.url}/health")
+    print(f"Service:    {health}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import os
+import threading
+
+from storage import normalize_skill
+
+
+# (floor, ceiling) cosine similarity per embedding model. Below the floor a
+# resume shows no evidence of a skill, so the LLM is not asked; at or above
+# the ceiling the evidence score is 10. Similarity ranges differ a lot between
+# models (ada-002 bunches above 0.7, the v3 models spread from about 0.1), so
+# models without an entry here don't gate at all. The floors are set below
+# the lowest similarity of skills actually present; recalibrate with
+# calibrate_thresholds() and set NIGHTINGALE_EVIDENCE_THRESHOLDS="floor,ceiling".
+EVIDENCE_THRESHOLDS = {
+    "text-embedding-ada-002": (0.72, 0.85),
+    "text-embedding-3-small": (0.12, 0.45),
+    "text-embedding-3-large": (0.10, 0.45),
+}
+TOP_SNIPPETS = 2
+SNIPPET_CHARS = 300
+
+
+def evidence_thresholds(model):
+    """(floor, ceiling) for an embedding model, or None when evidence shouldn't gate LLM calls."""
+    override = os.getenv("NIGHTINGALE_EVIDENCE_THRESHOLDS")
+    if override:
+        floor, ceiling = (float(value) for value in override.split(","))
+        return floor, ceiling
+    return EVIDENCE_THRESHOLDS.get(model)
+
+
+def calibrate_thresholds(embeddings, samples, margin=0.02):
+    """Derive (floor, ceiling) for an embedding backend from labeled samples.
+
+    `samples` are (skill, resume text, present) triples. The floor sits just
+    below the lowest similarity of any present skill, so no present skill is
+    gated; the ceiling is the median similarity of present skills.
+    """
+    import numpy as np
+    skills = [skill for skill, _, _ in samples]
+    texts = [text for _, text, _ in samples]
+    similarities = (_unit_rows(embeddings.embed_documents(skills)) * _unit_rows(embeddings.embed_documents(texts))).sum(axis=1)
+    present = np.array([similarity for similarity, (_, _, is_present) in zip(similarities, samples) if is_present])
+    if not len(present):
+        raise ValueError("Calibration needs samples where the skill is present")
+    floor = float(present.min()) - margin
+    return round(floor, 3), round(max(float(np.median(present)), floor + margin), 3)
+
+
+def _unit_rows(matrix):
+    import numpy as np
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def similarity_matrix(skill_vectors, chunk_vectors, chunk_counts):
+    """Candidate x skill matrix of the best cosine similarity over each candidate's chunks.
+
+    `chunk_vectors` stacks the chunks of all candidates in order and
+    `chunk_counts` says how many belong to each; candidates without chunks
+    get 0. Returns (matrix, per-chunk similarities as skill x chunk).
+    """
+    import numpy as np
+    skills = _unit_rows(skill_vectors)
+    chunks = _unit_rows(chunk_vectors) if len(chunk_vectors) else np.zeros((0, skills.shape[1]), np.float32)
+    similarities = skills @ chunks.T
+    matrix = np.zeros((len(chunk_counts), len(skills)), np.float32)
+    offsets = np.cumsum([0] + list(chunk_counts))
+    present = [i for i, count in enumerate(chunk_counts) if count]
+    if present:
+        maxima = np.maximum.reduceat(similarities, offsets[present], axis=1)
+        matrix[present] = maxima.T
+    return matrix, similarities
+
+
+class SkillPrescorer:
+    """Scores skill evidence in resumes from embeddings, without any LLM call.
+
+    Skill embeddings are computed once and kept per normalized skill, and a
+    whole candidate pool is scored with one matrix product: each (candidate,
+    skill) pair gets its best chunk similarity, a 0-10 evidence score and the
+    best matching snippets above the evidence floor. Pairs below the floor
+    need no LLM judgement. Without thresholds (an uncalibrated model) every
+    pair needs one and only similarities and snippets are reported.
+    """
+
+    def __init__(self, embeddings, thresholds=None, top_snippets=TOP_SNIPPETS):
+        self.embeddings = embeddings
+        if thresholds is None:
+            thresholds = evidence_thresholds(getattr(embeddings, "model", None))
+        self.floor, self.ceiling = thresholds or (None, None)
+        self.top_snippets = top_snippets
+        self._skill_vectors = {}
+        self._lock = threading.Lock()
+
+    def skill_vectors(self, skills):
+        """Embeddings of the skills, embedding only the ones not seen before."""
+        keys = [normalize_skill(skill) for skill in skills]
+        with self._lock:
+            missing = list(dict.fromkeys(key for key in keys if key not in self._skill_vectors))
+        if missing:
+            vectors = self.embeddings.embed_documents(missing)
+            with self._lock:
+                self._skill_vectors.update(zip(missing, vectors))
+        with self._lock:
+            return [self._skill_vectors[key] for key in keys]
+
+    def evidence(self, similarity):
+        """Evidence score (0-10) for a similarity, or None without thresholds."""
+        if self.floor is None:
+            return None
+        scaled = (similarity - self.floor) / (self.ceiling - self.floor)
+        return int(round(10 * min(1.0, max(0.0, scaled))))
+
+    def prescore(self, chunk_sets, skills, chunk_vectors=None):
+        """Pre-score every candidate against every skill.
+
+        `chunk_sets` holds the text chunks of each candidate; pass their
+        embeddings stacked in the same order as `chunk_vectors` to skip
+        embedding them (e.g. when a vector store already did). Returns one
+        dict per candidate mapping each skill to its similarity, evidence
+        score, top snippets and whether it needs an LLM judgement.
+        """
+        import numpy as np
+        if not skills:
+            return [{} for _ in chunk_sets]
+        if chunk_vectors is None:
+            texts = [chunk for chunks in chunk_sets for chunk in chunks]
+            chunk_vectors = self.embeddings.embed_documents(texts) if texts else []
+        counts = [len(chunks) for chunks in chunk_sets]
+        matrix, similarities = similarity_matrix(self.skill_vectors(skills), chunk_vectors, counts)
+        start = 0
+        reports = []
+        for candidate, chunks in enumerate(chunk_sets):
+            block = similarities[:, start:start + len(chunks)]
+            start += len(chunks)
+            top = np.argsort(-block, axis=1)[:, :self.top_snippets] if len(chunks) else None
+            report = {}
+            for index, skill in enumerate(skills):
+                similarity = float(matrix[candidate, index])
+                report[skill] = {
+                    "similarity": round(similarity, 3),
+                    "evidence": self.evidence(similarity),
+                    "snippets": [
+                        chunks[i][:SNIPPET_CHARS] for i in (top[index] if top is not None else [])
+                        if self.floor is None or block[index, i] >= self.floor
+                    ],
+                    "needs_llm": self.floor is None or similarity >= self.floor,
+                }
+            reports.append(report)
+        return reports
@@ -0,0 +1,96 @@
+import hashlib
+import threading
+import weakref
+
+
+def credential_key(provider, secret):
+    """Registry key for a credential that never contains the secret itself."""
+    return f"{provider}:" + hashlib.sha256((secret or "").encode("utf-8")).hexdigest()[:16]
+
+
+class ResourceRegistry:
+    """Process-wide pool of expensive objects shared by every session and agent.
+
+    LLM clients, HTTP connection pools, embedding backends, limiters and
+    caches are created once per (kind, key), where the key identifies the
+    credential and settings they depend on, and handed to every caller that
+    asks for the same thing. Memory and open connections then grow with the
+    number of distinct accounts and models, not with concurrent recruiters.
+    """
+
+    def __init__(self):
+        self._resources = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self.created = {}
+        self.reused = {}
+        self.owners = 0
+
+    def get(self, kind, key, factory):
+        """Return the shared resource for (kind, key), creating it with factory() on first use.
+
+        If factory raises, nothing is stored and the next caller tries again.
+        """
+        with self._lock:
+            if (kind, key) in self._resources:
+                self.reused[kind] = self.reused.get(kind, 0) + 1
+                return self._resources[(kind, key)]
+            key_lock = self._key_locks.setdefault((kind, key), threading.Lock())
+        # Build outside the registry lock so slow factories don't block other kinds
+        with key_lock:
+            with self._lock:
+                if (kind, key) in self._resources:
+                    self.reused[kind] = self.reused.get(kind, 0) + 1
+                    return self._resources[(kind, key)]
+            resource = factory()
+            with self._lock:
+                self._resources[(kind, key)] = resource
+                self.created[kind] = self.created.get(kind, 0) + 1
+            return resource
+
+    def attach(self, owner):
+        """Count an object (e.g. an agent) using the registry until it is garbage collected."""
+        with self._lock:
+            self.owners += 1
+        weakref.finalize(owner, self._detach)
+
+    def _detach(self):
+        with self._lock:
+            self.owners -= 1
+
+    def discard(self, kind, key=None):
+        """Drop one shared resource, or every resource of a kind, so it is rebuilt on next use."""
+        with self._lock:
+            for resource_kind, resource_key in list(self._resources):
+                if resource_kind == kind and (key is None or resource_key == key):
+                    resource = self._resources.pop((resource_kind, resource_key))
+                    close = getattr(resource, "close", None)
+                    if callable(close):
+                        close()
+
+    def snapshot(self):
+        """Live instances per kind, how often each kind was created and reused, and active owners."""
+        with self._lock:
+            instances = {}
+            for kind, _ in self._resources:
+                instances[kind] = instances.get(kind, 0) + 1
+            kinds = set(instances) | set(self.created) | set(self.reused)
+            return {
+                "owners": self.owners,
+                "resources": {
+                    kind: {
+                        "instances": instances.get(kind, 0),
+                        "created": self.created.get(kind, 0),
+                        "reused": self.reused.get(kind, 0),
+                    }
+                    for kind in sorted(kinds)
+                },
+            }
+
+
+_registry = ResourceRegistry()
+
+
+def get_registry():
+    """Return the process-wide resource registry."""
+    return _registry
@@ -0,0 +1,310 @@
+import re
+
+
+# Heading aliases per section, compared after lowercasing and stripping punctuation
+SECTION_HEADINGS = {
+    "summary": {"summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about me", "about", "overview", "career summary", "personal statement"},
+    "experience": {"experience", "work experience", "professional experience", "employment", "employment history",
+                   "work history", "career history", "relevant experience", "professional background",
+                   "experience and employment"},
+    "education": {"education", "academic background", "academics", "education and training", "qualifications",
+                  "academic qualifications", "education and certifications"},
+    "skills": {"skills", "technical skills", "core competencies", "key skills", "competencies", "technologies",
+               "skills and tools", "tools and technologies", "tech stack", "areas of expertise", "skill set",
+               "skills and abilities", "core skills"},
+    "projects": {"projects", "personal projects", "key projects", "selected projects", "academic projects",
+                 "side projects", "open source", "portfolio"},
+}
+# Other headings are kept under "other" so nothing is silently dropped
+OTHER_HEADINGS = {"certifications", "certificates", "licenses and certifications", "awards", "honors",
+                  "honors and awards", "achievements", "publications", "languages", "volunteer experience",
+                  "volunteering", "interests", "hobbies", "activities", "leadership", "references", "courses",
+                  "training", "patents", "memberships", "affiliations"}
+
+MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+DATE = rf"(?:{MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}})"
+DATE_RANGE_PATTERN = re.compile(
+    rf"({DATE})\s*(?:-|–|—|to|until)\s*({DATE}|present|current|now|today)", re.IGNORECASE
+)
+SINGLE_DATE_PATTERN = re.compile(rf"\b({MONTH}\s+\d{{4}}|(?:19|20)\d{{2}})\b", re.IGNORECASE)
+BULLET_PATTERN = re.compile(r"^\s*(?:[-*•▪◦●■►–]|\d{1,2}[.)])\s+")
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+# Spaces and tabs only, so a number never runs into the next line
+PHONE_PATTERN = re.compile(r"(?:\+?\(?\d[\d \t().-]{7,}\d)")
+URL_PATTERN = re.compile(r"(?:https?://|www\.)\S+|(?:linkedin\.com|github\.com)/\S+", re.IGNORECASE)
+
+# Sections each call type needs, in the order they are rendered into the prompt
+PROMPT_SECTIONS = {
+    "direct_skill_analysis": ("header", "skills", "experience", "projects", "summary", "education", "other"),
+    "analyze_resume_weaknesses": ("header", "skills", "experience", "projects", "summary"),
+    "generate_interview_questions": ("header", "summary", "experience", "projects", "skills"),
+    "analyze_ats_compatibility": ("header", "summary", "experience", "skills"),
+    "ask_question": ("contact", "header", "summary", "experience", "education", "skills", "projects", "other"),
+    "generate_improved_resume": ("contact", "header", "summary", "experience", "education", "skills", "projects",
+                                 "other"),
+}
+# Prompt size limits in characters per call type; None sends the sections in full
+PROMPT_CHAR_LIMITS = {
+    "direct_skill_analysis": 4000,
+    "analyze_resume_weaknesses": 4000,
+    "generate_interview_questions": 3000,
+    "analyze_ats_compatibility": 2000,
+}
+
+
+def _heading_key(line):
+    return re.sub(r"[^a-z& ]", "", line.lower()).replace("&", "and").strip()
+
+
+def match_heading(line):
+    """Return the section name if a line is a section heading, else None."""
+    stripped = line.strip().strip(":").strip()
+    if not stripped or len(stripped) > 40 or BULLET_PATTERN.match(line):
+        return None
+    key = " ".join(_heading_key(stripped).split())
+    for section, aliases in SECTION_HEADINGS.items():
+        if key in aliases:
+            return section
+    if key in OTHER_HEADINGS:
+        return "other"
+    return None
+
+
+def _parse_contact(lines):
+    text = "\n".join(lines)
+    contact = {
+        "name": None,
+        "email": (EMAIL_PATTERN.search(text) or [None])[0],
+        "phone": None,
+        "links": [match.rstrip(".,;)") for match in URL_PATTERN.findall(text)],
+    }
+    for match in PHONE_PATTERN.findall(text):
+        if sum(char.isdigit() for char in match) >= 9 and not DATE_RANGE_PATTERN.search(match):
+            contact["phone"] = match.strip()
+            break
+    for line in lines:
+        candidate = line.strip()
+        if candidate and not EMAIL_PATTERN.search(candidate) and not URL_PATTERN.search(candidate) \
+                and not any(char.isdigit() for char in candidate) and len(candidate.split()) <= 5:
+            contact["name"] = candidate.split("|")[0].strip()
+            break
+    return contact
+
+
+def _header_lines(lines, contact):
+    """Header lines that aren't contact details, such as a headline or location."""
+    header = []
+    for line in lines:
+        if line.strip() == contact["name"]:
+            continue
+        rest = URL_PATTERN.sub("", EMAIL_PATTERN.sub("", line))
+        rest = PHONE_PATTERN.sub(
+            lambda match: "" if sum(char.isdigit() for char in match.group(0)) >= 9 else match.group(0), rest
+        )
+        rest = " | ".join(part.strip(" ,;-–—") for part in re.split(r"[|•·]", rest) if part.strip(" ,;-–—"))
+        if rest:
+            header.append(rest)
+    return header
+
+
+def _parse_entries(lines):
+    """Group section lines into entries: heading lines (title, organization, dates) then details."""
+    entries = []
+    current = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if BULLET_PATTERN.match(line) or (current and current["details"] and len(stripped) > 100):
+            if current is None:
+                current = {"heading": "", "dates": None, "details": []}
+                entries.append(current)
+            current["details"].append(BULLET_PATTERN.sub("", line).strip())
+            continue
+        dates = DATE_RANGE_PATTERN.search(stripped)
+        starts_entry = current is None or current["details"] or (dates and current["dates"])
+        if current is not None and not starts_entry and len(stripped) > 100:
+            # Prose under a heading is a description, not another heading line
+            current["details"].append(stripped)
+            continue
+        if starts_entry:
+            current = {"heading": "", "dates": None, "details": []}
+            entries.append(current)
+        if not current["dates"]:
+            dates = dates or (SINGLE_DATE_PATTERN.search(stripped) if len(stripped) < 80 else None)
+            if dates:
+                current["dates"] = dates.group(0)
+                stripped = (stripped[:dates.start()] + stripped[dates.end():]).strip(" ,|()–—-")
+        if stripped:
+            current["heading"] = f"{current['heading']} | {stripped}" if current["heading"] else stripped
+    return entries
+
+
+def _parse_skills(lines):
+    skills = []
+    seen = set()
+    for line in lines:
+        line = BULLET_PATTERN.sub("", line)
+        # "Languages: Python, Go" lists the skills after the label
+        if ":" in line:
+            line = line.split(":", 1)[1]
+        for item in re.split(r"[,;|•·]|\s{2,}|\t", line):
+            item = item.strip(" .-*")
+            if item and len(item) <= 50 and item.lower() not in seen:
+                seen.add(item.lower())
+                skills.append(item)
+    return skills
+
+
+def parse_resume(text):
+    """Split resume text into sections without any LLM call.
+
+    Returns a dict with "contact" (name, email, phone, links), "header" (other
+    short lines above the first section, such as a headline or location), "summary" (text),
+    "experience", "education" and "projects" (lists of entries with heading,
+    dates and details), "skills" (list) and "other" (heading -> text for
+    sections like certifications or awards). Text before the first heading
+    goes to contact, or to the summary when it reads like prose. If no
+    headings are found, "unstructured" is True and the whole text is kept
+    under "text" so nothing is lost.
+    """
+    blocks = {"header": []}
+    other = {}
+    current = "header"
+    found = False
+    for line in text.splitlines():
+        section = match_heading(line)
+        if section:
+            found = True
+            if section == "other":
+                current = ("other", line.strip().strip(":").strip())
+                other.setdefault(current[1], [])
+            else:
+                current = section
+                blocks.setdefault(section, [])
+            continue
+        if isinstance(current, tuple):
+            other[current[1]].append(line)
+        else:
+            blocks[current].append(line)
+
+    header = [line for line in blocks["header"] if line.strip()]
+    contact_lines = [line for line in header if len(line.strip()) <= 100]
+    prose = [line.strip() for line in header if len(line.strip()) > 100]
+    summary_lines = [line.strip() for line in blocks.get("summary", []) if line.strip()]
+    contact = _parse_contact(contact_lines)
+    return {
+        "contact": contact,
+        "header": _header_lines(contact_lines, contact),
+        "summary": " ".join(prose + [BULLET_PATTERN.sub("", line) for line in summary_lines]),
+        "experience": _parse_entries(blocks.get("experience", [])),
+        "education": _parse_entries(blocks.get("education", [])),
+        "skills": _parse_skills(blocks.get("skills", [])),
+        "projects": _parse_entries(blocks.get("projects", [])),
+        "other": {heading: "\n".join(line.strip() for line in lines if line.strip()) for heading, lines in other.items()},
+        "unstructured": not found,
+        "text": text if not found else None,
+    }
+
+
+def resume_to_markdown(text):
+    """Convert plain resume text to Markdown with the same rules the parser uses.
+
+    The name becomes the title, section headings become "##" headings,
+    entry lines (title, organization, dates) in experience, education and
+    projects are bolded and bullets are normalized to "-".
+    """
+    contact_name = _parse_contact([line for line in text.splitlines()[:5] if line.strip()])["name"]
+    output = []
+    section = None
+    title_done = False
+
+    def blank():
+        if output and output[-1] != "":
+            output.append("")
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            blank()
+            continue
+        heading = match_heading(line)
+        # Checked before the ALL-CAPS heading rule, so "JOHN SMITH" stays the title
+        if not title_done and section is None and not heading and stripped == contact_name:
+            output.append(f"# {stripped}")
+            output.append("")
+            title_done = True
+        elif heading or (stripped.isupper() and len(stripped) <= 40 and len(stripped.split()) <= 5):
+            section = heading
+            blank()
+            title = stripped.strip(":").strip()
+            output.append(f"## {title.title() if title.isupper() else title}")
+            output.append("")
+        elif BULLET_PATTERN.match(line):
+            output.append(f"- {BULLET_PATTERN.sub('', line).strip()}")
+        elif section in ("experience", "education", "projects") and len(stripped) < 100:
+            if output and output[-1].startswith("**"):
+                # Title, organization and dates lines of one entry stay together
+                output[-1] += "  "
+            else:
+                blank()
+            output.append(f"**{stripped}**")
+        elif section == "summary":
+            output.append(stripped)
+        else:
+            # Contact, skills and other lines keep their line breaks
+            output.append(f"{stripped}  ")
+    return "\n".join(output).strip() + "\n"
+
+
+def _render(sections, include, max_details):
+    parts = []
+    for name in include:
+        if name == "contact":
+            contact = sections["contact"]
+            fields = [contact.get("name"), contact.get("email"), contact.get("phone")] + contact.get("links", [])
+            if any(fields):
+                parts.append("CONTACT: " + " | ".join(field for field in fields if field))
+        elif name == "header" and sections.get("header"):
+            parts.append("HEADLINE: " + " | ".join(sections["header"]))
+        elif name == "summary" and sections["summary"]:
+            parts.append(f"SUMMARY: {sections['summary']}")
+        elif name == "skills" and sections["skills"]:
+            parts.append("SKILLS: " + ", ".join(sections["skills"]))
+        elif name in ("experience", "education", "projects") and sections[name]:
+            lines = [f"{name.upper()}:"]
+            for entry in sections[name]:
+                dates = f" ({entry['dates']})" if entry["dates"] else ""
+                lines.append(f"- {entry['heading']}{dates}")
+                details = entry["details"] if max_details is None else entry["details"][:max_details]
+                lines.extend(f"  • {detail}" for detail in details)
+            parts.append("\n".join(lines))
+        elif name == "other":
+            parts.extend(f"{heading.upper()}: {body}" for heading, body in sections["other"].items() if body)
+    return "\n".join(parts)
+
+
+def compact_resume(sections, include=None, max_chars=None):
+    """Render parsed sections as compact prompt text.
+
+    Only the sections in `include` are rendered, in that order. To fit
+    `max_chars`, the bullets kept per entry are reduced first, so every
+    entry and section still appears; only then is the text cut off.
+    Unstructured resumes are passed through as text.
+    """
+    if sections.get("unstructured"):
+        text = sections["text"] or ""
+        return text if max_chars is None else text[:max_chars]
+    include = include or ("contact", "header", "summary", "experience", "education", "skills", "projects", "other")
+    text = _render(sections, include, None)
+    for max_details in (5, 3, 2, 1, 0):
+        if max_chars is None or len(text) <= max_chars:
+            break
+        text = _render(sections, include, max_details)
+    return text if max_chars is None else text[:max_chars]
+
+
+def resume_for_prompt(sections, call_type):
+    """Compact resume text with only the sections and size a call type needs."""
+    return compact_resume(sections, PROMPT_SECTIONS.get(call_type), PROMPT_CHAR_LIMITS.get(call_type))
@@ -8,10 +8,8 @@ import warnings
 import os
 import sys
 
-# Suppress torch warnings and other unnecessary warnings
+# Suppress unnecessary warnings
 warnings.filterwarnings("ignore", category=UserWarning)
-warnings.filterwarnings("ignore", message=".*torch.classes.*")
-warnings.filterwarnings("ignore", message=".*_path.*")
 
 # Set environment variables to suppress additional warnings
 os.environ["PYTHONWARNINGS"] = "ignore"
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Headless HTTP service for the Nightingale Recruitment Agent.
+
+Exposes resume analysis, Q&A, interview questions and resume improvement over
+a small JSON API so other systems (e.g. an ATS) can call them without the
+Streamlit UI. Analyses run as jobs on a bounded worker pool: submit with
+POST /analyze, then poll GET /jobs/<job_id>.
+
+Run with:
+    python service.py --port 8000 --workers 4 --queue-size 32
+"""
+
+import argparse
+import base64
+import binascii
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dotenv import load_dotenv
+from agents import ResumeAnalysisAgent, UploadedDocument
+from extraction import ExtractionError
+from llm import BudgetExceeded
+from resources import get_registry
+
+load_dotenv()
+
+
+def document_from_payload(payload, prefix):
+    """Build a document from `<prefix>_text` or `<prefix>_base64` + `<prefix>_filename`.
+
+    Base64 documents may be PDF, DOCX, HTML or TXT; the format is detected from the content.
+    """
+    if payload.get(f"{prefix}_text"):
+        if not isinstance(payload[f"{prefix}_text"], str):
+            raise InvalidPayload(f"{prefix}_text must be a string")
+        return UploadedDocument(f"{prefix}.txt", payload[f"{prefix}_text"].encode("utf-8"))
+    if payload.get(f"{prefix}_base64"):
+        filename = payload.get(f"{prefix}_filename", f"{prefix}.pdf")
+        if not isinstance(filename, str):
+            raise InvalidPayload(f"{prefix}_filename must be a string")
+        try:
+            data = base64.b64decode(payload[f"{prefix}_base64"], validate=True)
+        except (binascii.Error, TypeError):
+            raise InvalidPayload(f"{prefix}_base64 is not valid base64")
+        return UploadedDocument(filename, data)
+    return None
+
+
+def string_list_from_payload(payload, field):
+    """Return a list field of non-empty strings (e.g. skills), or None if it isn't set."""
+    values = payload.get(field)
+    if values is None:
+        return None
+    if not isinstance(values, list) or not all(isinstance(value, str) and value.strip() for value in values):
+        raise InvalidPayload(f"{field} must be a list of non-empty strings")
+    return values
+
+
+class InvalidPayload(Exception):
+    """Raised when a request field has the wrong type or can't be decoded."""
+
+
+class QueueFull(Exception):
+    """Raised when the worker pool has no room for more work."""
+
+
+class AnalysisService:
+    """Bounded worker pool and job registry behind the HTTP API."""
+
+    def __init__(self, groq_api_key, openai_api_key=None, workers=4, queue_size=32, max_jobs=1000,
+                 cutoff_score=75):
+        self.groq_api_key = groq_api_key
+        self.openai_api_key = openai_api_key
+        self.cutoff_score = cutoff_score
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_jobs = max_jobs
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis")
+        self.jobs = OrderedDict()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+        # One agent serves every job: analyses run on their own AnalysisContext,
+        # so jobs share its client pool and the API is only pinged once
+        self.agent = self.new_agent(test_connection=True)
+
+    def new_agent(self, test_connection=False):
+        return ResumeAnalysisAgent(
+            groq_api_key=self.groq_api_key,
+            openai_api_key=self.openai_api_key,
+            cutoff_score=self.cutoff_score,
+            test_connection=test_connection
+        )
+
+    def _reserve(self):
+        """Take a place in the queue, or raise QueueFull (backpressure)."""
+        with self._lock:
+            if self.pending >= self.workers + self.queue_size:
+                self.rejected += 1
+                raise QueueFull("Service is at capacity, please retry later")
+            self.pending += 1
+
+    def _finish(self):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def submit_analysis(self, resume, role_requirements=None, custom_jd=None):
+        """Queue an analysis job and return its id."""
+        self._reserve()
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+            "error_detail": None,
+            "context": None,
+        }
+        with self._lock:
+            self.jobs[job_id] = job
+            # Forget the oldest finished jobs once the registry is full
+            while len(self.jobs) > self.max_jobs:
+                oldest_id, oldest = next(iter(self.jobs.items()))
+                if oldest["status"] in ("queued", "running"):
+                    break
+                self.jobs.pop(oldest_id)
+        self.executor.submit(self._run_analysis, job, resume, role_requirements, custom_jd)
+        return job_id
+
+    def _run_analysis(self, job, resume, role_requirements, custom_jd):
+        job["status"] = "running"
+        job["started_at"] = time.time()
+        try:
+            context = self.agent.analyze(resume, role_requirements=role_requirements, custom_jd=custom_jd)
+            if context:
+                job["context"] = context
+                job["result"] = context.result
+                job["status"] = "completed"
+            else:
+                job["error"] = "Analysis failed. Check that the resume contains readable text and skills were provided."
+                job["status"] = "failed"
+        except BudgetExceeded as e:
+            job["error"] = str(e)
+            job["status"] = "failed"
+        except ExtractionError as e:
+            job["error"] = str(e)
+            job["error_detail"] = e.to_dict()
+            job["status"] = "failed"
+        except Exception as e:
+            job["error"] = f"Error during analysis: {e}"
+            job["status"] = "failed"
+        finally:
+            job["finished_at"] = time.time()
+            self._finish()
+
+    def run_sync(self, fn, *args, **kwargs):
+        """Run a short call on the worker pool and wait for it."""
+        self._reserve()
+        try:
+            return self.executor.submit(fn, *args, **kwargs).result()
+        finally:
+            self._finish()
+
+    def get_job(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            statuses = {}
+            for job in self.jobs.values():
+                statuses[job["status"]] = statuses.get(job["status"], 0) + 1
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "jobs": statuses,
+                "resources": get_registry().snapshot(),
+                "single_flight": self.agent.single_flight.snapshot(),
+            }
+
+
+def job_view(job):
+    """Public view of a job, without its analysis context."""
+    view = {key: value for key, value in job.items() if key != "context"}
+    if job["started_at"] and job["finished_at"]:
+        view["duration"] = round(job["finished_at"] - job["started_at"], 3)
+    return view
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """JSON API handler; `service` is set on the server instance."""
+
+    server_version = "NightingaleService/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length).decode("utf-8"))
+
+    def _completed_job(self, job_id):
+        job = self.server.service.get_job(job_id)
+        if not job:
+            self._send(404, {"error": "Job not found"})
+            return None
+        if job["status"] != "completed":
+            self._send(409, {"error": f"Job is {job['status']}, not completed"})
+            return None
+        return job
+
+    def do_GET(self):
+        service = self.server.service
+        parts = self.path.strip("/").split("/")
+        if parts == ["health"]:
+            self._send(200, {"status": "ok", **service.stats()})
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = service.get_job(parts[1])
+            if job:
+                self._send(200, job_view(job))
+            else:
+                self._send(404, {"error": "Job not found"})
+        else:
+            self._send(404, {"error": "Not found"})
+
+    def do_POST(self):
+        service = self.server.service
+        parts = self.path.strip("/").split("/")
+        try:
+            payload = self._read_json()
+        except (ValueError, UnicodeDecodeError):
+            self._send(400, {"error": "Request body must be valid JSON"})
+            return
+        if not isinstance(payload, dict):
+            self._send(400, {"error": "Request body must be a JSON object"})
+            return
+
+        try:
+            if parts == ["analyze"]:
+                resume = document_from_payload(payload, "resume")
+                custom_jd = document_from_payload(payload, "jd")
+                skills = string_list_from_payload(payload, "skills")
+                if not resume:
+                    self._send(400, {"error": "Provide resume_text or resume_base64"})
+                    return
+                if not skills and not custom_jd:
+                    self._send(400, {"error": "Provide skills or a job description (jd_text / jd_base64)"})
+                    return
+                job_id = service.submit_analysis(resume, role_requirements=skills, custom_jd=custom_jd)
+                self._send(202, {"job_id": job_id, "status": "queued"}, {"Location": f"/jobs/{job_id}"})
+
+            elif len(parts) == 3 and parts[0] == "jobs":
+                job = self._completed_job(parts[1])
+                if not job:
+                    return
+                agent = service.agent
+                context = job["context"]
+                action = parts[2]
+                if action == "ask":
+                    if not isinstance(payload.get("question"), str) or not payload["question"].strip():
+                        self._send(400, {"error": "Provide a question"})
+                        return
+                    answer = service.run_sync(agent.ask_question, payload["question"], context=context)
+                    self._send(200, {"answer": answer})
+                elif action == "interview-questions":
+                    questions = service.run_sync(
+                        agent.generate_interview_questions,
+                        num_questions=payload.get("num_questions", 5),
+                        difficulty=payload.get("difficulty", "medium"),
+                        question_types=payload.get("question_types"),
+                        context=context
+                    )
+                    self._send(200, {"questions": questions})
+                elif action == "improved-resume":
+                    improved = service.run_sync(
+                        agent.generate_improved_resume,
+                        industry=payload.get("industry", "Technology/Software"),
+                        experience_level=payload.get("experience_level", "Mid Level"),
+                        resume_format=payload.get("resume_format", "Modern Professional"),
+                        enhancement_options=payload.get("enhancement_options"),
+                        context=context
+                    )
+                    if improved:
+                        self._send(200, improved)
+                    else:
+                        self._send(500, {"error": "Failed to generate improved resume"})
+                elif action == "ats":
+                    report = service.run_sync(
+                        agent.analyze_ats_compatibility,
+                        context.resume_text,
+                        target_keywords=string_list_from_payload(payload, "keywords"),
+                        llm_recommendations=payload.get("llm_recommendations", False),
+                        industry=payload.get("industry"),
+                        context=context
+                    )
+                    self._send(200, report)
+                else:
+                    self._send(404, {"error": "Not found"})
+            else:
+                self._send(404, {"error": "Not found"})
+
+        except InvalidPayload as e:
+            self._send(400, {"error": str(e)})
+        except QueueFull as e:
+            self._send(503, {"error": str(e)}, {"Retry-After": "1"})
+        except Exception as e:
+            self._send(500, {"error": str(e)})
+
+
+# Connections the kernel holds while the server is busy accepting; bursts
+# beyond this are reset before they can be answered with 503
+MIN_LISTEN_BACKLOG = 128
+
+
+class ServiceHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer with a configurable listen backlog (the default is 5)."""
+
+    def __init__(self, server_address, handler_class, request_queue_size=MIN_LISTEN_BACKLOG):
+        self.request_queue_size = request_queue_size
+        super().__init__(server_address, handler_class)
+
+
+def create_server(service, host="127.0.0.1", port=8000, verbose=False):
+    """Create the HTTP server for a service.
+
+    The listen backlog grows with the worker pool and queue, so a burst of
+    clients reaches the handler and gets a 503 instead of a reset connection.
+    """
+    backlog = max(MIN_LISTEN_BACKLOG, 4 * (service.workers + service.queue_size))
+    server = ServiceHTTPServer((host, port), ServiceHandler, request_queue_size=backlog)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nightingale Recruitment Agent HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent analyses")
+    parser.add_argument("--queue-size", type=int, default=32, help="Jobs allowed to wait before requests are rejected with 503")
+    parser.add_argument("--cutoff-score", type=int, default=int(os.getenv("CUTOFF_SCORE", 75)))
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    groq_api_key = os.getenv("GROQ_API_KEY")
+    if not groq_api_key:
+        print("❌ GROQ_API_KEY not found in environment")
+        return
+
+    service = AnalysisService(
+        groq_api_key=groq_api_key,
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        workers=args.workers,
+        queue_size=args.queue_size,
+        cutoff_score=args.cutoff_score
+    )
+    server = create_server(service, args.host, args.port, args.verbose)
+    print(f"🎯 Nightingale service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Nightingale service stopped.")
+    finally:
+        server.server_close()
+        service.executor.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    main()
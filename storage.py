@@ -0,0 +1,567 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from resources import get_registry
+
+
+DEFAULT_DB_PATH = os.getenv("NIGHTINGALE_DB", "nightingale.db")
+# Times a job is run before a retryable failure is given up on
+DEFAULT_MAX_ATTEMPTS = int(os.getenv("NIGHTINGALE_MAX_ATTEMPTS", "3"))
+
+
+def connect(path):
+    """Open a SQLite connection that can be shared between threads."""
+    connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class Checkpoint:
+    """Per-job view of the checkpoint table, handed to the agent during an analysis."""
+
+    def __init__(self, queue, job_id):
+        self.queue = queue
+        self.job_id = job_id
+        self._cache = queue.load_checkpoints(job_id)
+
+    def get(self, kind, skill):
+        return self._cache.get((kind, skill))
+
+    def put(self, kind, skill, data):
+        self._cache[(kind, skill)] = data
+        self.queue.save_checkpoint(self.job_id, kind, skill, data)
+
+
+class JobQueue:
+    """Durable SQLite-backed queue of candidate analysis jobs.
+
+    Each finished per-skill score and weakness result is checkpointed as it
+    completes, so an interrupted batch resumes without repeating LLM calls.
+    A failed job is retried by requeue_failed until it has run
+    `max_attempts` times, unless its failure was marked as not retryable.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.connection = connect(path)
+        self._lock = threading.Lock()
+        with self._lock, self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    batch_id TEXT NOT NULL,
+                    candidate TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL DEFAULT 3,
+                    retryable INTEGER NOT NULL DEFAULT 1,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_batch_status ON jobs (batch_id, status);
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    job_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    skill TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (job_id, kind, skill)
+                );
+            """)
+            # Queues created before retries were tracked lack these columns
+            columns = {row["name"] for row in self.connection.execute("PRAGMA table_info(jobs)")}
+            for column in ("max_attempts INTEGER NOT NULL DEFAULT 3", "retryable INTEGER NOT NULL DEFAULT 1"):
+                if column.split()[0] not in columns:
+                    self.connection.execute(f"ALTER TABLE jobs ADD COLUMN {column}")
+
+    def enqueue(self, batch_id, candidate, payload):
+        """Add a job for one candidate and return its id."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO jobs (job_id, batch_id, candidate, status, payload, max_attempts, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, batch_id, candidate, json.dumps(payload), self.max_attempts, now, now)
+            )
+        return job_id
+
+    def claim_next(self, batch_id=None):
+        """Mark the oldest queued job as running and return it, or None if there is none."""
+        while True:
+            with self._lock, self.connection:
+                if batch_id:
+                    row = self.connection.execute(
+                        "SELECT * FROM jobs WHERE batch_id = ? AND status = 'queued' ORDER BY created_at LIMIT 1",
+                        (batch_id,)
+                    ).fetchone()
+                else:
+                    row = self.connection.execute(
+                        "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                    ).fetchone()
+                if not row:
+                    return None
+                # Another process may have claimed the job since the SELECT
+                cursor = self.connection.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? "
+                    "WHERE job_id = ? AND status = 'queued'",
+                    (time.time(), row["job_id"])
+                )
+            if cursor.rowcount:
+                break
+        job = self._row_to_job(row)
+        job["status"] = "running"
+        job["attempts"] += 1
+        return job
+
+    def requeue_interrupted(self, batch_id=None):
+        """Put jobs left 'running' by a dead process back on the queue.
+
+        Only call this when no other process is working on the batch.
+        """
+        with self._lock, self.connection:
+            if batch_id:
+                cursor = self.connection.execute(
+                    "UPDATE jobs SET status = 'queued', updated_at = ? WHERE batch_id = ? AND status = 'running'",
+                    (time.time(), batch_id)
+                )
+            else:
+                cursor = self.connection.execute(
+                    "UPDATE jobs SET status = 'queued', updated_at = ? WHERE status = 'running'",
+                    (time.time(),)
+                )
+        return cursor.rowcount
+
+    def requeue_failed(self, batch_id=None):
+        """Put retryable failed jobs that have attempts left back on the queue."""
+        condition = "status = 'failed' AND retryable = 1 AND attempts < max_attempts"
+        with self._lock, self.connection:
+            if batch_id:
+                cursor = self.connection.execute(
+                    f"UPDATE jobs SET status = 'queued', updated_at = ? WHERE batch_id = ? AND {condition}",
+                    (time.time(), batch_id)
+                )
+            else:
+                cursor = self.connection.execute(
+                    f"UPDATE jobs SET status = 'queued', updated_at = ? WHERE {condition}",
+                    (time.time(),)
+                )
+        return cursor.rowcount
+
+    def complete(self, job_id, result):
+        with self._lock, self.connection:
+            self.connection.execute(
+                "UPDATE jobs SET status = 'completed', result = ?, error = NULL, updated_at = ? WHERE job_id = ?",
+                (json.dumps(result), time.time(), job_id)
+            )
+
+    def fail(self, job_id, error, result=None, retryable=True):
+        """Mark a job failed, keeping any partial result; requeue_failed retries it if `retryable`."""
+        with self._lock, self.connection:
+            self.connection.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, result = ?, retryable = ?, updated_at = ? "
+                "WHERE job_id = ?",
+                (error, json.dumps(result) if result else None, int(retryable), time.time(), job_id)
+            )
+
+    def save_checkpoint(self, job_id, kind, skill, data):
+        """Persist one finished per-skill result ("score" or "weakness")."""
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO checkpoints (job_id, kind, skill, data, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, kind, skill, json.dumps(data), time.time())
+            )
+
+    def load_checkpoints(self, job_id):
+        """Return {(kind, skill): data} for every checkpoint of a job."""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT kind, skill, data FROM checkpoints WHERE job_id = ?", (job_id,)
+            ).fetchall()
+        return {(row["kind"], row["skill"]): json.loads(row["data"]) for row in rows}
+
+    def checkpoint(self, job_id):
+        """Return the Checkpoint handle for a job."""
+        return Checkpoint(self, job_id)
+
+    def batch_jobs(self, batch_id):
+        """Return every job of a batch in submission order."""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT * FROM jobs WHERE batch_id = ? ORDER BY created_at", (batch_id,)
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def batch_status(self, batch_id):
+        """Return job counts per status for a batch."""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT status, COUNT(*) AS count FROM jobs WHERE batch_id = ? GROUP BY status", (batch_id,)
+            ).fetchall()
+        return {row["status"]: row["count"] for row in rows}
+
+    def _row_to_job(self, row):
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def close(self):
+        self.connection.close()
+
+
+def normalize_skill(skill):
+    """Normalize a skill name for storage and lookups."""
+    return " ".join(str(skill).lower().split())
+
+
+def resume_fingerprint(text):
+    """Fingerprint of a resume's text, insensitive to whitespace changes."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+def content_hash(text):
+    """Exact hash of a text, for memoizing results that depend on its layout."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def skill_evidence_key(text, skill):
+    """Hash of the lines of a text that mention a skill as a whole word, ignoring case and spacing.
+
+    Returns None when no line names the skill: its evidence (if any) is
+    indirect, so it can't be told apart from an unchanged resume.
+    """
+    pattern = re.compile(
+        r"(?<![\w+#])" + r"\s+".join(re.escape(part) for part in skill.split()) + r"(?![\w+#])", re.IGNORECASE
+    )
+    lines = [" ".join(line.lower().split()) for line in text.splitlines() if pattern.search(line)]
+    return content_hash("\n".join(lines))[:16] if lines else None
+
+
+def requisition_id(skills=None, jd_text=None):
+    """Derive a stable requisition id from a job description or skill list."""
+    if jd_text:
+        source = jd_text
+    else:
+        source = "\n".join(sorted(normalize_skill(skill) for skill in skills or []))
+    return "req-" + hashlib.sha256(source.encode("utf-8")).hexdigest()[:12]
+
+
+class ResultsStore:
+    """Persistent, indexed store of analysis results per candidate and requisition.
+
+    Overall and per-skill scores live in indexed columns so screening queries
+    such as "Python >= 8 and overall >= 75 for requisition X" don't need to
+    load or re-run any analysis. Analyses are identified by requisition,
+    candidate and resume fingerprint: saving the same resume for the same
+    requisition again replaces the earlier analysis, while two different
+    resumes uploaded under the same file name are kept apart.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self.connection = connect(path)
+        self._lock = threading.Lock()
+        with self._lock, self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS analyses (
+                    analysis_id TEXT PRIMARY KEY,
+                    requisition TEXT NOT NULL,
+                    candidate TEXT NOT NULL,
+                    overall_score INTEGER NOT NULL,
+                    selected INTEGER NOT NULL,
+                    result TEXT NOT NULL,
+                    metadata TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_analyses_requisition_score ON analyses (requisition, overall_score);
+                CREATE INDEX IF NOT EXISTS idx_analyses_candidate ON analyses (candidate);
+                CREATE TABLE IF NOT EXISTS skill_scores (
+                    analysis_id TEXT NOT NULL,
+                    requisition TEXT NOT NULL,
+                    skill TEXT NOT NULL,
+                    score INTEGER NOT NULL,
+                    PRIMARY KEY (analysis_id, skill)
+                );
+                CREATE INDEX IF NOT EXISTS idx_skill_scores_lookup ON skill_scores (requisition, skill, score);
+                CREATE INDEX IF NOT EXISTS idx_skill_scores_skill ON skill_scores (skill, score);
+            """)
+
+    def save(self, candidate, requisition, result, metadata=None, fingerprint=None):
+        """Store (or replace) the analysis of a candidate for a requisition and return its id.
+
+        The resume fingerprint defaults to result["resume_fingerprint"], which analyses record.
+        """
+        fingerprint = fingerprint or result.get("resume_fingerprint", "")
+        analysis_id = hashlib.sha256(f"{requisition}\0{candidate}\0{fingerprint}".encode("utf-8")).hexdigest()[:16]
+        skill_rows = [
+            (analysis_id, requisition, normalize_skill(skill), int(score))
+            for skill, score in result.get("skills_scores", {}).items()
+        ]
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM skill_scores WHERE analysis_id = ?", (analysis_id,))
+            self.connection.execute(
+                "INSERT OR REPLACE INTO analyses "
+                "(analysis_id, requisition, candidate, overall_score, selected, result, metadata, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (analysis_id, requisition, candidate, int(result.get("overall_score", 0)),
+                 int(bool(result.get("selected"))), json.dumps(result), json.dumps(metadata or {}), time.time())
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO skill_scores (analysis_id, requisition, skill, score) VALUES (?, ?, ?, ?)",
+                skill_rows
+            )
+        return analysis_id
+
+    def save_batch(self, batch, requisition, metadata=None):
+        """Store every successful candidate result of an analyze_batch / resume_batch output."""
+        return [
+            self.save(entry["candidate"], requisition, entry["result"], metadata)
+            for entry in batch.get("candidates", []) if entry.get("result")
+        ]
+
+    def query(self, requisition=None, min_overall=None, min_skills=None, selected=None, limit=100,
+              include_result=False, cutoff_score=None):
+        """Find analyses matching score filters, best overall score first.
+
+        min_skills maps skill names to minimum scores, e.g. {"Python": 8}.
+        With cutoff_score, `selected` is decided from the overall score
+        instead of the decision stored at analysis time.
+        """
+        conditions = []
+        params = []
+        if requisition is not None:
+            conditions.append("a.requisition = ?")
+            params.append(requisition)
+        if min_overall is not None:
+            conditions.append("a.overall_score >= ?")
+            params.append(min_overall)
+        if selected is not None and cutoff_score is not None:
+            conditions.append("a.overall_score >= ?" if selected else "a.overall_score < ?")
+            params.append(cutoff_score)
+        elif selected is not None:
+            conditions.append("a.selected = ?")
+            params.append(int(selected))
+        for skill, min_score in (min_skills or {}).items():
+            if requisition is not None:
+                conditions.append(
+                    "a.analysis_id IN (SELECT analysis_id FROM skill_scores "
+                    "WHERE requisition = ? AND skill = ? AND score >= ?)"
+                )
+                params.extend([requisition, normalize_skill(skill), min_score])
+            else:
+                conditions.append(
+                    "EXISTS (SELECT 1 FROM skill_scores s WHERE s.analysis_id = a.analysis_id "
+                    "AND s.skill = ? AND s.score >= ?)"
+                )
+                params.extend([normalize_skill(skill), min_score])
+
+        columns = "a.analysis_id, a.requisition, a.candidate, a.overall_score, a.selected, a.metadata, a.created_at"
+        if include_result:
+            columns += ", a.result"
+        sql = f"SELECT {columns} FROM analyses a"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY a.overall_score DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self.connection.execute(sql, params).fetchall()
+        analyses = []
+        for row in rows:
+            analysis = dict(row)
+            analysis["selected"] = (
+                analysis["overall_score"] >= cutoff_score if cutoff_score is not None else bool(analysis["selected"])
+            )
+            analysis["metadata"] = json.loads(analysis["metadata"])
+            if include_result:
+                analysis["result"] = json.loads(analysis["result"])
+            analyses.append(analysis)
+        return analyses
+
+    def get(self, analysis_id):
+        """Return the full stored result of one analysis, or None."""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT result FROM analyses WHERE analysis_id = ?", (analysis_id,)
+            ).fetchone()
+        return json.loads(row["result"]) if row else None
+
+    def iter_results(self, requisition, batch_size=500):
+        """Yield {"candidate", "result"} entries for a requisition without loading them all at once."""
+        # A dedicated connection so the open cursor doesn't block other users of the store
+        connection = connect(self.path)
+        try:
+            cursor = connection.execute(
+                "SELECT candidate, result FROM analyses WHERE requisition = ? ORDER BY overall_score DESC",
+                (requisition,)
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield {"candidate": row["candidate"], "result": json.loads(row["result"])}
+        finally:
+            connection.close()
+
+    def requisition_skills(self, requisition):
+        """Return the normalized skills scored for a requisition."""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT DISTINCT skill FROM skill_scores WHERE requisition = ? ORDER BY skill", (requisition,)
+            ).fetchall()
+        return [row["skill"] for row in rows]
+
+    def skill_scores(self, analysis_ids):
+        """Return {analysis_id: {skill: score}} for the given analyses."""
+        analysis_ids = list(analysis_ids)
+        scores = {analysis_id: {} for analysis_id in analysis_ids}
+        if not analysis_ids:
+            return scores
+        placeholders = ", ".join("?" for _ in analysis_ids)
+        with self._lock:
+            rows = self.connection.execute(
+                f"SELECT analysis_id, skill, score FROM skill_scores WHERE analysis_id IN ({placeholders})",
+                analysis_ids
+            ).fetchall()
+        for row in rows:
+            scores[row["analysis_id"]][row["skill"]] = row["score"]
+        return scores
+
+    def close(self):
+        self.connection.close()
+
+
+class ResumeSkillMemo:
+    """SkillResultCache entries of one resume, with the same get/put interface as Checkpoint.
+
+    With the resume text, each result is stored with a key of the lines
+    that mention its skill. With a fallback fingerprint (a near-identical
+    earlier resume), a result missing for this resume is read from the
+    fallback only if the lines mentioning the skill are unchanged, so an
+    added or removed skill line is scored again. A skill neither resume
+    names is always scored again, since related evidence ("built ETL
+    pipelines" for "Data Engineering") may have changed. New results are
+    always written under this resume's fingerprint.
+    """
+
+    def __init__(self, cache, fingerprint, fallback=None, resume_text=None):
+        self.cache = cache
+        self.fingerprint = fingerprint
+        self.fallback = fallback if resume_text is not None else None
+        self.resume_text = resume_text
+
+    def get(self, kind, skill):
+        data = self.cache.get(self.fingerprint, kind, skill)
+        if data is None and self.fallback:
+            evidence = self.cache.get(self.fallback, "evidence", skill)
+            if evidence is not None and evidence == skill_evidence_key(self.resume_text, skill):
+                data = self.cache.get(self.fallback, kind, skill)
+        return data
+
+    def put(self, kind, skill, data):
+        self.cache.put(self.fingerprint, kind, skill, data)
+        evidence = skill_evidence_key(self.resume_text, skill) if self.resume_text is not None else None
+        if evidence is not None:
+            self.cache.put(self.fingerprint, "evidence", skill, evidence)
+
+
+class SkillResultCache:
+    """Memo of per-skill results keyed by (resume fingerprint, kind, normalized skill).
+
+    When a recruiter edits the skill list or JD, only the skills that are new
+    for this resume need an LLM call. Entries are kept in an in-memory LRU and,
+    if a path is given, also in SQLite so they survive restarts.
+    """
+
+    def __init__(self, path=None, max_entries=100000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.connection = connect(path) if path else None
+        if self.connection:
+            with self._lock, self.connection:
+                self.connection.execute("""
+                    CREATE TABLE IF NOT EXISTS skill_cache (
+                        fingerprint TEXT NOT NULL,
+                        kind TEXT NOT NULL,
+                        skill TEXT NOT NULL,
+                        data TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        PRIMARY KEY (fingerprint, kind, skill)
+                    )
+                """)
+
+    def get(self, fingerprint, kind, skill):
+        key = (fingerprint, kind, normalize_skill(skill))
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            row = None
+            if self.connection:
+                row = self.connection.execute(
+                    "SELECT data FROM skill_cache WHERE fingerprint = ? AND kind = ? AND skill = ?", key
+                ).fetchone()
+            if not row:
+                self.misses += 1
+                return None
+            self.hits += 1
+            data = json.loads(row["data"])
+            self._remember(key, data)
+            return data
+
+    def put(self, fingerprint, kind, skill, data):
+        key = (fingerprint, kind, normalize_skill(skill))
+        with self._lock:
+            self._remember(key, data)
+            if self.connection:
+                with self.connection:
+                    self.connection.execute(
+                        "INSERT OR REPLACE INTO skill_cache (fingerprint, kind, skill, data, created_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        key + (json.dumps(data), time.time())
+                    )
+
+    def _remember(self, key, data):
+        self.entries[key] = data
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def for_resume(self, fingerprint, fallback=None, resume_text=None):
+        """Return the memo view for one resume, optionally falling back to a near-identical one."""
+        return ResumeSkillMemo(self, fingerprint, fallback, resume_text)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+def get_shared_results_store(path=None):
+    """Return the process-wide results store for a database path (default NIGHTINGALE_DB)."""
+    path = path or DEFAULT_DB_PATH
+    return get_registry().get("store", ("results", path), lambda: ResultsStore(path))
+
+
+def get_shared_skill_cache():
+    """Return the process-wide skill result cache (persisted if NIGHTINGALE_SKILL_CACHE_DB is set)."""
+    path = os.getenv("NIGHTINGALE_SKILL_CACHE_DB")
+    return get_registry().get("cache", ("skill_results", path), lambda: SkillResultCache(path))
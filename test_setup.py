@@ -5,9 +5,22 @@ Run this to check if everything is working correctly.
 """
 
 import os
+import re
+import subprocess
 import sys
 from dotenv import load_dotenv
 
+# Seconds a fresh interpreter may take to import each module below
+IMPORT_TIME_BUDGET = float(os.getenv("IMPORT_TIME_BUDGET", "1.0"))
+STARTUP_MODULES = ["llm", "storage", "resources", "extraction", "dedup", "prescore", "agents", "service", "ui"]
+HEAVY_MODULES = ["torch", "langchain", "langchain_core", "langchain_community", "faiss",
+                 "matplotlib", "plotly", "PyPDF2", "pyarrow"]
+# Third-party packages from requirements.txt; a module that can't be imported
+# only because one of these is missing is skipped, any other failure fails
+THIRD_PARTY_MODULES = {"streamlit", "PyPDF2", "dotenv", "plotly", "pandas", "numpy", "requests", "langchain",
+                       "langchain_core", "langchain_community", "langchain_openai", "langchain_groq", "faiss",
+                       "openai", "groq", "pyarrow", "fitz", "docx", "torch", "matplotlib"}
+
 def test_imports():
     """Test if all required packages are available."""
     print("🔍 Testing imports...")
@@ -49,6 +62,91 @@ def test_imports():
     
     return True
 
+def test_import_time():
+    """Test that app modules import within budget without loading heavy dependencies."""
+    print(f"\n⏱️  Testing import time (budget {IMPORT_TIME_BUDGET:.2f}s per module)...")
+    
+    script = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        "heavy = [m for m in {heavy!r} if m in sys.modules]\n"
+        "print(f'{{elapsed:.3f}} {{\",\".join(heavy)}}')\n"
+    )
+    passed = True
+    for module in STARTUP_MODULES:
+        # A fresh interpreter per module, so earlier imports don't hide the cost
+        process = subprocess.run(
+            [sys.executable, "-c", script.format(module=module, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        if process.returncode != 0:
+            missing = re.search(r"ModuleNotFoundError: No module named '([\w.]+)'", process.stderr)
+            if missing and missing.group(1).split(".")[0] in THIRD_PARTY_MODULES:
+                print(f"⚠️  {module} - needs {missing.group(1)}, which isn't installed here; skipped")
+                continue
+            print(f"❌ {module} - failed to import:\n{process.stderr.strip()}")
+            passed = False
+            continue
+        elapsed, _, heavy = process.stdout.strip().splitlines()[-1].partition(" ")
+        elapsed = float(elapsed)
+        if heavy:
+            print(f"❌ {module} - imports heavy dependencies at startup: {heavy}")
+            passed = False
+        elif elapsed > IMPORT_TIME_BUDGET:
+            print(f"❌ {module} - {elapsed:.3f}s is over budget")
+            passed = False
+        else:
+            print(f"✅ {module} - {elapsed:.3f}s")
+    
+    return passed
+
+def test_text_processing():
+    """Test the local text pipeline (cleanup, parsing, keyword matching) on known tricky inputs."""
+    print("\n📝 Testing text processing...")
+    from extraction import normalize_text
+    from resume_parser import parse_resume, resume_to_markdown
+    from ats import KeywordMatcher, get_industry_index
+    
+    results = []
+    def check(name, ok):
+        print(f"{'✅' if ok else '❌'} {name}")
+        results.append(ok)
+    
+    check("Year on a single page is kept", "2019" in normalize_text("2019\nJane Doe\nEngineer\n2021")[0])
+    check("Year at a page edge is kept",
+          "2015" in normalize_text("Jane Doe\nEducation\nMIT\n2015\fExperience\nAcme\nEngineer")[0])
+    check("Running page numbers are removed",
+          normalize_text("Jane\nPython\n1\fAcme\nGo\n2\fMIT\nSQL\n3")[0].split("\n")
+          == ["Jane", "Python", "Acme", "Go", "MIT", "SQL"])
+    check("Hyphenated line breaks keep real compounds",
+          normalize_text("A well-\nknown, state-of-the-\nart experi-\nence")[0] == "A well-known, state-of-the-art experience")
+    sections = parse_resume("Jane Doe\nSenior Data Engineer\nBerlin | (555) 123-4567\n8 years\n\nSKILLS\nPython")
+    check("Headline and location are kept", sections["header"] == ["Senior Data Engineer", "Berlin", "8 years"])
+    check("Phone numbers stay on one line", sections["contact"]["phone"] == "(555) 123-4567")
+    check("ALL-CAPS name becomes the Markdown title",
+          resume_to_markdown("JOHN SMITH\njohn@example.com\n\nSKILLS\nPython").startswith("# JOHN SMITH\n"))
+    counts = KeywordMatcher(["React", "React Native", "Native", "C", "C++"]).count("React Native apps in C++")
+    check("Overlapping keywords are all matched",
+          counts == {"React": 1, "React Native": 1, "Native": 1, "C": 0, "C++": 1})
+    # Industry coverage must find every keyword a per-keyword search finds
+    index = get_industry_index()
+    text = "Ensured regulatory compliance, inventory management, medical records and preventive maintenance."
+    coverage = index.coverage(text)
+    check("Industry coverage matches a per-keyword scan", all(
+        coverage[industry]["matched"] == [
+            keyword for keyword in keywords
+            if re.search(r"(?<![\w+#])" + re.escape(keyword) + r"(?![\w+#])", text, re.IGNORECASE)
+        ]
+        for industry, keywords in index.industries.items()
+    ))
+    every_keyword = ", ".join(keyword for keywords in index.industries.values() for keyword in keywords)
+    check("Every industry keyword is found", all(
+        entry["coverage"] == 1.0 for entry in index.coverage(every_keyword).values()
+    ))
+    return all(results)
+
 def test_api_key():
     """Test if Groq API key is available."""
     print("\n🔑 Testing API key...")
@@ -98,6 +196,12 @@ def main():
     # Test imports
     imports_ok = test_imports()
     
+    # Test startup cost
+    startup_ok = test_import_time()
+    
+    # Test local text processing
+    text_ok = test_text_processing()
+    
     # Test API key
     api_key_ok = test_api_key()
     
@@ -107,10 +211,12 @@ def main():
     print("\n" + "=" * 50)
     print("📊 Test Results:")
     print(f"   Imports: {'✅ PASS' if imports_ok else '❌ FAIL'}")
+    print(f"   Startup: {'✅ PASS' if startup_ok else '❌ FAIL'}")
+    print(f"   Text:    {'✅ PASS' if text_ok else '❌ FAIL'}")
     print(f"   API Key: {'✅ PASS' if api_key_ok else '❌ FAIL'}")
     print(f"   Agent:   {'✅ PASS' if agent_ok else '❌ FAIL'}")
     
-    if imports_ok and api_key_ok and agent_ok:
+    if imports_ok and startup_ok and text_ok and api_key_ok and agent_ok:
         print("\n🎉 All tests passed! You can run the application with:")
         print("   streamlit run app.py")
     else:
@@ -120,6 +226,9 @@ def main():
             print("\n💡 To install missing packages:")
             print("   pip install -r requirements.txt")
         
+        if not startup_ok:
+            print("\n💡 Move heavy imports into the functions that use them")
+        
         if not api_key_ok:
             print("\n💡 To set up API key:")
             print("   1. Get free key at: https://console.groq.com/")
@@ -1,10 +1,12 @@
 import streamlit as st
 import pandas as pd
-import base64
-import io
-import matplotlib.pyplot as plt
-import plotly.express as px
-import plotly.graph_objects as go
+
+# Above these sizes charts switch to an aggregated / WebGL rendering
+SKILL_BAR_LIMIT = 40
+CANDIDATE_BAR_LIMIT = 30
+# Figures memoized per score fingerprint; st.cache_data hands each rerun its own copy,
+# so changing a figure never leaks into another session's chart
+FIGURE_CACHE_SIZE = 256
 
 def apply_custom_css():
     """Apply custom CSS styling to the Streamlit app."""
@@ -150,26 +152,34 @@ def setup_page():
     """Setup the main page configuration and styling."""
     apply_Nightingale_theme()
 
-def display_score_gauge(score, title="Overall Score"):
-    """Display a gauge chart for the overall score."""
+def score_color(score):
+    return '#e74c3c' if score <= 5 else '#f39c12' if score <= 7 else '#27ae60'
+
+def display_score_gauge(score, title="Overall Score", threshold=75):
+    """Display a gauge chart for the overall score against the selection threshold."""
+    return _score_gauge(score, title, threshold)
+
+@st.cache_data(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def _score_gauge(score, title, threshold):
+    import plotly.graph_objects as go
     fig = go.Figure(go.Indicator(
         mode = "gauge+number+delta",
         value = score,
         domain = {'x': [0, 1], 'y': [0, 1]},
         title = {'text': title, 'font': {'size': 20, 'color': '#e74c3c'}},
-        delta = {'reference': 75},
+        delta = {'reference': threshold},
         gauge = {
             'axis': {'range': [None, 100], 'tickcolor': '#e74c3c'},
             'bar': {'color': "#e74c3c"},
             'steps': [
                 {'range': [0, 50], 'color': "#f8d7da"},
-                {'range': [50, 75], 'color': "#fff3cd"},
-                {'range': [75, 100], 'color': "#d4edda"}
+                {'range': [50, threshold], 'color': "#fff3cd"},
+                {'range': [threshold, 100], 'color': "#d4edda"}
             ],
             'threshold': {
                 'line': {'color': "#c0392b", 'width': 4},
                 'thickness': 0.75,
-                'value': 75
+                'value': threshold
             }
         }
     ))
@@ -182,16 +192,31 @@ def display_score_gauge(score, title="Overall Score"):
     )
     return fig
 
-def display_skills_chart(skills_scores):
-    """Display a horizontal bar chart of skills scores."""
+def display_skills_chart(skills_scores, mode="auto"):
+    """Display a chart of skills scores.
+
+    mode "bars" draws one bar per skill, "aggregated" draws how many skills got
+    each score (fixed size, for large skill lists); "auto" picks by size.
+    Figures are memoized by the scores, so reruns reuse them.
+    """
     if not skills_scores:
         return None
+    if mode == "auto":
+        mode = "bars" if len(skills_scores) <= SKILL_BAR_LIMIT else "aggregated"
+    scores_key = tuple(skills_scores.items())
+    if mode == "aggregated":
+        return _aggregated_skills_chart(scores_key)
+    return _skills_bar_chart(scores_key)
+
+@st.cache_data(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def _skills_bar_chart(scores_key):
+    import plotly.graph_objects as go
     
-    skills = list(skills_scores.keys())
-    scores = list(skills_scores.values())
+    skills = [skill for skill, _ in scores_key]
+    scores = [score for _, score in scores_key]
     
     # Create color mapping based on score with Nightingale theme
-    colors = ['#e74c3c' if score <= 5 else '#f39c12' if score <= 7 else '#27ae60' for score in scores]
+    colors = [score_color(score) for score in scores]
     
     fig = go.Figure(data=[
         go.Bar(
@@ -224,8 +249,58 @@ def display_skills_chart(skills_scores):
     
     return fig
 
-def display_analysis_results(result):
-    """Display the complete analysis results."""
+@st.cache_data(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def _aggregated_skills_chart(scores_key):
+    import plotly.graph_objects as go
+    
+    skills_by_score = {score: [] for score in range(11)}
+    for skill, score in scores_key:
+        skills_by_score[min(max(int(score), 0), 10)].append(skill)
+    scores = list(skills_by_score)
+    counts = [len(skills) for skills in skills_by_score.values()]
+    # Hover lists a few skills per score instead of drawing one bar each
+    hover = [
+        ", ".join(skills[:15]) + (f" and {len(skills) - 15} more" if len(skills) > 15 else "")
+        for skills in skills_by_score.values()
+    ]
+    
+    fig = go.Figure(data=[
+        go.Bar(
+            x=scores,
+            y=counts,
+            marker_color=[score_color(score) for score in scores],
+            text=counts,
+            textposition='auto',
+            customdata=hover,
+            hovertemplate="Score %{x}: %{y} skills<br>%{customdata}<extra></extra>",
+        )
+    ])
+    
+    fig.update_layout(
+        title={
+            'text': f"Skills Assessment Scores ({len(scores_key)} skills)",
+            'font': {'size': 18, 'color': '#e74c3c'},
+            'x': 0.5
+        },
+        xaxis_title="Score (0-10)",
+        yaxis_title="Number of Skills",
+        height=400,
+        showlegend=False,
+        font={'color': '#2c3e50'},
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        xaxis={'gridcolor': '#ecf0f1', 'dtick': 1},
+        yaxis={'gridcolor': '#ecf0f1'}
+    )
+    
+    return fig
+
+def display_analysis_results(result, cutoff_score=75):
+    """Display the complete analysis results.
+
+    Pass a result with selection already decided for cutoff_score
+    (see agents.apply_cutoff).
+    """
     if not result:
         st.error("No analysis results to display.")
         return
@@ -237,14 +312,14 @@ def display_analysis_results(result):
     
     with col1:
         # Display gauge chart
-        gauge_fig = display_score_gauge(result.get('overall_score', 0))
+        gauge_fig = display_score_gauge(result.get('overall_score', 0), threshold=cutoff_score)
         st.plotly_chart(gauge_fig, use_container_width=True)
     
     with col2:
         st.metric(
             label="Overall Score",
             value=f"{result.get('overall_score', 0)}%",
-            delta=f"{result.get('overall_score', 0) - 75}% vs threshold"
+            delta=f"{result.get('overall_score', 0) - cutoff_score}% vs threshold"
         )
     
     with col3:
@@ -310,6 +385,42 @@ def display_analysis_results(result):
         with st.expander("📋 Detailed Skills Reasoning"):
             for skill, reasoning in result['skill_reasoning'].items():
                 st.markdown(f"**{skill}:** {reasoning}")
+    
+    # Token usage and cost (collapsible)
+    if result.get('usage'):
+        with st.expander("💰 Token Usage & Cost"):
+            display_usage_summary(result['usage'])
+            normalization = result.get('text_normalization')
+            if normalization and normalization.get('chars_saved'):
+                st.caption(
+                    f"Text cleanup removed {normalization['chars_saved']:,} characters "
+                    f"(~{normalization['tokens_saved']:,} tokens per prompt that embeds the resume)"
+                )
+            near_duplicate = result.get('near_duplicate')
+            if near_duplicate:
+                match = "an identical" if near_duplicate['exact'] else f"a {near_duplicate['similarity']:.0%} similar"
+                st.caption(f"Resubmission: {match} resume was analyzed before; its saved skill results were reused")
+
+def display_usage_summary(usage):
+    """Display token usage and estimated cost, broken down by call type."""
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("LLM Calls", usage.get('calls', 0))
+    col2.metric("Prompt Tokens", f"{usage.get('prompt_tokens', 0):,}")
+    col3.metric("Completion Tokens", f"{usage.get('completion_tokens', 0):,}")
+    col4.metric("Estimated Cost", f"${usage.get('cost', 0):.4f}")
+    
+    if usage.get('by_call_type'):
+        rows = [
+            {
+                "Call Type": call_type,
+                "Calls": stats.get('calls', 0),
+                "Prompt Tokens": stats.get('prompt_tokens', 0),
+                "Completion Tokens": stats.get('completion_tokens', 0),
+                "Cost ($)": round(stats.get('cost', 0), 6)
+            }
+            for call_type, stats in usage['by_call_type'].items()
+        ]
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
 
 def display_interview_questions(questions, key_suffix=""):
     """Display generated interview questions."""
@@ -344,8 +455,63 @@ def create_downloadable_report(result, questions=None):
     # You could implement this using libraries like reportlab or weasyprint
     pass
 
-def display_comparison_chart(candidates_data):
-    """Display comparison chart for multiple candidates."""
-    # This is a placeholder for multi-candidate comparison
-    # Could be implemented for batch processing
-    pass
\ No newline at end of file
+def display_comparison_chart(candidates_data, cutoff_score=75):
+    """Display comparison chart for multiple candidates.
+
+    candidates_data is a list of {"candidate", "result"} entries, as in the
+    output of ResumeAnalysisAgent.analyze_batch. Small pools get one bar per
+    candidate; large pools are drawn as a WebGL scatter of overall scores.
+    """
+    scores_key = tuple(
+        (entry["candidate"], entry["result"].get("overall_score", 0))
+        for entry in candidates_data if entry.get("result")
+    )
+    if not scores_key:
+        return None
+    return _comparison_chart(scores_key, cutoff_score)
+
+@st.cache_data(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def _comparison_chart(scores_key, cutoff_score):
+    import plotly.graph_objects as go
+    
+    ranked = sorted(scores_key, key=lambda item: item[1], reverse=True)
+    candidates = [candidate for candidate, _ in ranked]
+    scores = [score for _, score in ranked]
+    colors = ['#27ae60' if score >= cutoff_score else '#e74c3c' for score in scores]
+    
+    if len(ranked) <= CANDIDATE_BAR_LIMIT:
+        fig = go.Figure(data=[
+            go.Bar(y=candidates, x=scores, orientation='h', marker_color=colors, text=scores, textposition='auto')
+        ])
+        fig.add_vline(x=cutoff_score, line={'color': '#c0392b', 'width': 2, 'dash': 'dash'})
+        fig.update_layout(
+            xaxis_title="Overall Score (%)",
+            yaxis={'autorange': 'reversed', 'gridcolor': '#ecf0f1'},
+            height=max(400, len(ranked) * 30)
+        )
+    else:
+        fig = go.Figure(data=[
+            go.Scattergl(
+                x=list(range(1, len(ranked) + 1)),
+                y=scores,
+                mode='markers',
+                marker={'color': colors, 'size': 6},
+                text=candidates,
+                hovertemplate="#%{x} %{text}: %{y}%<extra></extra>",
+            )
+        ])
+        fig.add_hline(y=cutoff_score, line={'color': '#c0392b', 'width': 2, 'dash': 'dash'})
+        fig.update_layout(xaxis_title="Rank", yaxis_title="Overall Score (%)", height=450)
+    
+    fig.update_layout(
+        title={
+            'text': f"Candidate Comparison ({len(ranked)} candidates)",
+            'font': {'size': 18, 'color': '#e74c3c'},
+            'x': 0.5
+        },
+        showlegend=False,
+        font={'color': '#2c3e50'},
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
\ No newline at end of file